@@ -1,6 +1,5 @@
 import os
 from dotenv import load_dotenv
-import openai
 import logging
 
 logger = logging.getLogger("flux_prompt")
@@ -52,6 +51,7 @@ class Config:
         """Validate the API key by making a simple request"""
         try:
             # Simple validation - try to list models
+            import openai
             client = openai.OpenAI(api_key=self.openai_api_key)
             _ = client.models.list()
             return True, ""
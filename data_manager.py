@@ -1,13 +1,18 @@
 import csv
+import io
 import os
 import uuid
 import shutil
 import logging
+import threading
 from datetime import datetime
 from typing import Dict, List, Optional
 from pathlib import Path
 import re
 
+# Rows buffered per write when importing a CSV
+IMPORT_BATCH_SIZE = 1000
+
 class PromptDataManager:
     def __init__(self, csv_file='prompts/prompts.csv'):
         self.logger = logging.getLogger("flux_prompt")
@@ -17,6 +22,8 @@ class PromptDataManager:
         if not os.path.isabs(csv_file):
             csv_file = str((base_dir / csv_file).resolve())
         self.csv_file = csv_file
+        # One instance is shared across sessions; serialize read-modify-write cycles
+        self._lock = threading.RLock()
 
         self.fieldnames = [
             'id', 'timestamp', 'context', 'art_style', 'camera_angle',
@@ -53,13 +60,14 @@ class PromptDataManager:
         }
         
         try:
-            # Create backup before writing
-            self._create_backup()
-            
-            with open(self.csv_file, 'a', newline='', encoding='utf-8') as file:
-                writer = csv.DictWriter(file, fieldnames=self.fieldnames)
-                writer.writerow(row_data)
-                self.logger.info(f"✅ Saved prompt to CSV: {self.csv_file}")
+            with self._lock:
+                # Create backup before writing
+                self._create_backup()
+                
+                with open(self.csv_file, 'a', newline='', encoding='utf-8') as file:
+                    writer = csv.DictWriter(file, fieldnames=self.fieldnames)
+                    writer.writerow(row_data)
+            self.logger.info(f"✅ Saved prompt to CSV: {self.csv_file}")
             return prompt_id
         except Exception as e:
             raise Exception(f"Failed to save prompt: {str(e)}")
@@ -89,13 +97,9 @@ class PromptDataManager:
     
     def load_all_prompts(self) -> List[Dict[str, str]]:
         """Load all prompts from CSV"""
-        prompts = []
         try:
             with open(self.csv_file, 'r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    prompts.append(row)
-            return prompts
+                return list(csv.DictReader(file))
         except Exception as e:
             raise Exception(f"Failed to load prompts: {str(e)}")
     
@@ -109,49 +113,70 @@ class PromptDataManager:
     
     def update_prompt(self, prompt_id: str, updated_data: Dict[str, str]) -> bool:
         """Update an existing prompt"""
-        try:
-            prompts = self.load_all_prompts()
-            updated = False
-            
-            for prompt in prompts:
-                if prompt['id'] == prompt_id:
-                    # Update timestamp
-                    prompt['timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    # Update data fields
-                    for key, value in updated_data.items():
-                        if key in self.fieldnames:
-                            prompt[key] = value
-                    updated = True
-                    break
-            
-            if updated:
-                # Write all prompts back to file
-                with open(self.csv_file, 'w', newline='', encoding='utf-8') as file:
-                    writer = csv.DictWriter(file, fieldnames=self.fieldnames)
-                    writer.writeheader()
-                    writer.writerows(prompts)
-                return True
-            return False
-        except Exception as e:
-            raise Exception(f"Failed to update prompt: {str(e)}")
+        with self._lock:
+            try:
+                prompts = self.load_all_prompts()
+                updated = False
+                
+                for prompt in prompts:
+                    if prompt['id'] == prompt_id:
+                        # Update timestamp
+                        prompt['timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                        # Update data fields
+                        for key, value in updated_data.items():
+                            if key in self.fieldnames:
+                                prompt[key] = value
+                        updated = True
+                        break
+                
+                if updated:
+                    # Write all prompts back to file
+                    with open(self.csv_file, 'w', newline='', encoding='utf-8') as file:
+                        writer = csv.DictWriter(file, fieldnames=self.fieldnames)
+                        writer.writeheader()
+                        writer.writerows(prompts)
+                    return True
+                return False
+            except Exception as e:
+                raise Exception(f"Failed to update prompt: {str(e)}")
     
     def delete_prompt(self, prompt_id: str) -> bool:
         """Delete a prompt by ID"""
-        try:
-            prompts = self.load_all_prompts()
-            original_count = len(prompts)
-            prompts = [p for p in prompts if p['id'] != prompt_id]
-            
-            if len(prompts) < original_count:
-                # Write remaining prompts back to file
-                with open(self.csv_file, 'w', newline='', encoding='utf-8') as file:
-                    writer = csv.DictWriter(file, fieldnames=self.fieldnames)
-                    writer.writeheader()
-                    writer.writerows(prompts)
-                return True
-            return False
-        except Exception as e:
-            raise Exception(f"Failed to delete prompt: {str(e)}")
+        with self._lock:
+            try:
+                prompts = self.load_all_prompts()
+                original_count = len(prompts)
+                prompts = [p for p in prompts if p['id'] != prompt_id]
+                
+                if len(prompts) < original_count:
+                    # Write remaining prompts back to file
+                    with open(self.csv_file, 'w', newline='', encoding='utf-8') as file:
+                        writer = csv.DictWriter(file, fieldnames=self.fieldnames)
+                        writer.writeheader()
+                        writer.writerows(prompts)
+                    return True
+                return False
+            except Exception as e:
+                raise Exception(f"Failed to delete prompt: {str(e)}")
+    
+    def delete_many(self, prompt_ids: List[str]) -> int:
+        """Delete several prompts with a single rewrite, returning how many were removed"""
+        with self._lock:
+            try:
+                ids = set(prompt_ids)
+                prompts = self.load_all_prompts()
+                remaining = [p for p in prompts if p['id'] not in ids]
+                deleted_count = len(prompts) - len(remaining)
+                
+                if deleted_count:
+                    # Write remaining prompts back to file once
+                    with open(self.csv_file, 'w', newline='', encoding='utf-8') as file:
+                        writer = csv.DictWriter(file, fieldnames=self.fieldnames)
+                        writer.writeheader()
+                        writer.writerows(remaining)
+                return deleted_count
+            except Exception as e:
+                raise Exception(f"Failed to delete prompts: {str(e)}")
     
     def get_prompt_summary_list(self) -> List[Dict[str, str]]:
         """Get a summary list of prompts for display (ID, timestamp, context preview)"""
@@ -208,14 +233,36 @@ class PromptDataManager:
         
         return output_file
     
-    def import_from_csv(self, input_file: str) -> int:
-        """Import prompts from a CSV file"""
-        imported_count = 0
-
+    def import_from_csv(self, input_file) -> int:
+        """Import prompts from a CSV file path or an open (binary or text) file object"""
         try:
-            with open(input_file, 'r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
+            if isinstance(input_file, (str, os.PathLike)):
+                with open(input_file, 'r', newline='', encoding='utf-8') as file:
+                    return self._import_rows(csv.DictReader(file))
+
+            if isinstance(input_file, io.TextIOBase):
+                return self._import_rows(csv.DictReader(input_file))
+
+            # Decode binary streams (e.g. uploads) without copying them to disk
+            text = io.TextIOWrapper(input_file, encoding='utf-8', newline='')
+            try:
+                return self._import_rows(csv.DictReader(text))
+            finally:
+                # Leave the caller's stream open
+                text.detach()
+        except Exception as e:
+            raise Exception(f"Failed to import from CSV: {str(e)}")
+
+    def _import_rows(self, rows) -> int:
+        """Append imported rows with fresh ids/timestamps, writing in batches"""
+        with self._lock:
+            imported_count = 0
+            batch = []
+
+            # Open the output once for the whole import
+            with open(self.csv_file, 'a', newline='', encoding='utf-8') as outfile:
+                writer = csv.DictWriter(outfile, fieldnames=self.fieldnames)
+                for row in rows:
                     # Build a proper output row with new id/timestamp
                     out_row = {key: '' for key in self.fieldnames}
                     out_row['id'] = str(uuid.uuid4())[:8]
@@ -227,13 +274,14 @@ class PromptDataManager:
                         if key in out_row and key not in ['id', 'timestamp']:
                             out_row[key] = val
 
-                    # Append to CSV
-                    with open(self.csv_file, 'a', newline='', encoding='utf-8') as outfile:
-                        writer = csv.DictWriter(outfile, fieldnames=self.fieldnames)
-                        writer.writerow(out_row)
+                    batch.append(out_row)
+                    if len(batch) >= IMPORT_BATCH_SIZE:
+                        writer.writerows(batch)
+                        imported_count += len(batch)
+                        batch = []
 
-                    imported_count += 1
-        except Exception as e:
-            raise Exception(f"Failed to import from CSV: {str(e)}")
+                if batch:
+                    writer.writerows(batch)
+                    imported_count += len(batch)
 
-        return imported_count
+            return imported_count
@@ -155,7 +155,7 @@ class ImageGenerator:
             try:
                 source_type = "edited" if (source_image_url or mask_image_url) else "generated"
                 vault_prompt = prompt if not source_image_url else f"Edit: {prompt}"
-                self.vault.save_image(
+                vault_id = self.vault.save_image(
                     image_url=result.get_image_url(0),
                     prompt=vault_prompt,
                     provider=result.provider,
@@ -171,6 +171,8 @@ class ImageGenerator:
                     },
                     source_type=source_type
                 )
+                # Callers can read the vault copy instead of downloading the URL again
+                result.metadata = {**(result.metadata or {}), "vault_id": vault_id}
                 logger.info(f"Image automatically saved to vault (provider: {result.provider})")
             except Exception as e:
                 logger.warning(f"Failed to auto-save image to vault: {e}")
@@ -2,10 +2,12 @@
 Image Vault - Automatic storage and management of generated images
 """
 
+import hashlib
 import json
 import os
 import uuid
 import shutil
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional, Any
@@ -38,6 +40,13 @@ class ImageVault:
         # Metadata file
         self.metadata_file = self.vault_dir / "vault_metadata.json"
         self.metadata = self._load_metadata()
+        # One instance is shared across sessions; serialize read-modify-write cycles
+        self._lock = threading.RLock()
+        
+        # get_vault_stats() result, dropped whenever the metadata is saved; the
+        # generation counts saves, so a stale computation is never stored
+        self._stats: Optional[Dict[str, Any]] = None
+        self._generation = 0
         
         logger.info(f"Image Vault initialized at: {self.vault_dir}")
     
@@ -69,14 +78,42 @@ class ImageVault:
     
     def _save_metadata(self):
         """Save vault metadata to file"""
-        try:
-            self.metadata["metadata"]["last_updated"] = datetime.now().isoformat()
-            self.metadata["metadata"]["total_images"] = len(self.metadata["images"])
-            
-            with open(self.metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(self.metadata, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            logger.error(f"Failed to save vault metadata: {e}")
+        with self._lock:
+            self._stats = None
+            self._generation += 1
+            try:
+                self.metadata["metadata"]["last_updated"] = datetime.now().isoformat()
+                self.metadata["metadata"]["total_images"] = len(self.metadata["images"])
+                
+                with open(self.metadata_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.metadata, f, indent=2, ensure_ascii=False)
+            except Exception as e:
+                logger.error(f"Failed to save vault metadata: {e}")
+    
+    def _write_image(self, image_bytes: bytes) -> str:
+        """
+        Store image bytes under a content-addressed name
+        
+        Identical images share one file named by their SHA-256 digest, so
+        saving a duplicate only adds a metadata entry.
+        
+        Returns:
+            Filename of the stored image within the vault
+        """
+        image_filename = f"{hashlib.sha256(image_bytes).hexdigest()}.png"
+        image_path = self.vault_dir / image_filename
+        with self._lock:
+            if not image_path.exists():
+                # Write to a temporary name first so a crash never leaves a
+                # truncated file under the final, content-addressed name
+                tmp_path = self.vault_dir / f".{image_filename}.{uuid.uuid4().hex[:8]}.tmp"
+                try:
+                    with open(tmp_path, 'wb') as f:
+                        f.write(image_bytes)
+                    os.replace(tmp_path, image_path)
+                finally:
+                    tmp_path.unlink(missing_ok=True)
+        return image_filename
     
     def save_image(
         self,
@@ -112,31 +149,28 @@ class ImageVault:
             response = requests.get(image_url, timeout=30)
             response.raise_for_status()
             
-            # Save image file
-            image_filename = f"{image_id}.png"
-            image_path = self.vault_dir / image_filename
-            
-            with open(image_path, 'wb') as f:
-                f.write(response.content)
-            
-            # Create metadata entry
-            image_metadata = {
-                "id": image_id,
-                "filename": image_filename,
-                "prompt": prompt,
-                "provider": provider,
-                "model": model,
-                "style": style,
-                "source_type": source_type,
-                "timestamp": timestamp.isoformat(),
-                "date": timestamp.strftime('%Y-%m-%d'),
-                "time": timestamp.strftime('%H:%M:%S'),
-                "metadata": metadata or {}
-            }
-            
-            # Add to vault
-            self.metadata["images"][image_id] = image_metadata
-            self._save_metadata()
+            # Write the file and add its entry under one lock, so a concurrent
+            # delete of a duplicate cannot unlink the shared file in between
+            with self._lock:
+                image_filename = self._write_image(response.content)
+                
+                # Create metadata entry
+                image_metadata = {
+                    "id": image_id,
+                    "filename": image_filename,
+                    "prompt": prompt,
+                    "provider": provider,
+                    "model": model,
+                    "style": style,
+                    "source_type": source_type,
+                    "timestamp": timestamp.isoformat(),
+                    "date": timestamp.strftime('%Y-%m-%d'),
+                    "time": timestamp.strftime('%H:%M:%S'),
+                    "metadata": metadata or {}
+                }
+                
+                self.metadata["images"][image_id] = image_metadata
+                self._save_metadata()
             
             logger.info(f"Image saved to vault: {image_id} ({image_filename})")
             return image_id
@@ -175,31 +209,28 @@ class ImageVault:
             image_id = str(uuid.uuid4())[:8]
             timestamp = datetime.now()
             
-            # Save image file
-            image_filename = f"{image_id}.png"
-            image_path = self.vault_dir / image_filename
-            
-            with open(image_path, 'wb') as f:
-                f.write(image_bytes)
-            
-            # Create metadata entry
-            image_metadata = {
-                "id": image_id,
-                "filename": image_filename,
-                "prompt": prompt,
-                "provider": provider,
-                "model": model,
-                "style": style,
-                "source_type": source_type,
-                "timestamp": timestamp.isoformat(),
-                "date": timestamp.strftime('%Y-%m-%d'),
-                "time": timestamp.strftime('%H:%M:%S'),
-                "metadata": metadata or {}
-            }
-            
-            # Add to vault
-            self.metadata["images"][image_id] = image_metadata
-            self._save_metadata()
+            # Write the file and add its entry under one lock, so a concurrent
+            # delete of a duplicate cannot unlink the shared file in between
+            with self._lock:
+                image_filename = self._write_image(image_bytes)
+                
+                # Create metadata entry
+                image_metadata = {
+                    "id": image_id,
+                    "filename": image_filename,
+                    "prompt": prompt,
+                    "provider": provider,
+                    "model": model,
+                    "style": style,
+                    "source_type": source_type,
+                    "timestamp": timestamp.isoformat(),
+                    "date": timestamp.strftime('%Y-%m-%d'),
+                    "time": timestamp.strftime('%H:%M:%S'),
+                    "metadata": metadata or {}
+                }
+                
+                self.metadata["images"][image_id] = image_metadata
+                self._save_metadata()
             
             logger.info(f"Image saved to vault: {image_id} ({image_filename})")
             return image_id
@@ -215,6 +246,45 @@ class ImageVault:
             return self.vault_dir / filename
         return None
     
+    def get_thumbnail_path(self, image_id: str, size: int = 512) -> Optional[Path]:
+        """
+        Get a small WebP copy of an image, creating it on first use
+        
+        Thumbnails are kept under thumbs/ in the vault and rebuilt when the
+        image file is newer than its thumbnail.
+        
+        Args:
+            image_id: ID of the image
+            size: Longest side of the thumbnail in pixels
+            
+        Returns:
+            Path to the thumbnail, or None if it could not be created
+        """
+        image_path = self.get_image_path(image_id)
+        if not image_path or not image_path.exists():
+            return None
+        
+        # Named after the image file, so entries sharing a file share its thumbnail
+        thumb_path = self.vault_dir / "thumbs" / f"{image_path.stem}.webp"
+        try:
+            if thumb_path.exists() and thumb_path.stat().st_mtime_ns >= image_path.stat().st_mtime_ns:
+                return thumb_path
+            
+            with self._lock:
+                # Another session may have written it while we waited
+                if thumb_path.exists() and thumb_path.stat().st_mtime_ns >= image_path.stat().st_mtime_ns:
+                    return thumb_path
+                thumb_path.parent.mkdir(exist_ok=True)
+                with Image.open(image_path) as img:
+                    img.thumbnail((size, size))
+                    if img.mode not in ("RGB", "RGBA"):
+                        img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+                    img.save(thumb_path, format="WEBP", quality=85)
+            return thumb_path
+        except Exception as e:
+            logger.warning(f"Failed to create thumbnail for {image_id}: {e}")
+            return None
+    
     def get_image_metadata(self, image_id: str) -> Optional[Dict[str, Any]]:
         """Get metadata for an image by ID"""
         return self.metadata["images"].get(image_id)
@@ -242,7 +312,8 @@ class ImageVault:
         Returns:
             List of image metadata dictionaries
         """
-        images = list(self.metadata["images"].values())
+        with self._lock:
+            images = list(self.metadata["images"].values())
         
         # Apply filters
         if source_type:
@@ -270,28 +341,38 @@ class ImageVault:
     
     def delete_image(self, image_id: str) -> bool:
         """Delete an image from the vault"""
-        if image_id not in self.metadata["images"]:
-            return False
-        
-        try:
-            # Delete image file
-            image_path = self.get_image_path(image_id)
-            if image_path and image_path.exists():
-                image_path.unlink()
-            
-            # Remove from metadata
-            del self.metadata["images"][image_id]
-            self._save_metadata()
+        with self._lock:
+            if image_id not in self.metadata["images"]:
+                return False
             
-            logger.info(f"Image deleted from vault: {image_id}")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to delete image: {e}")
-            return False
+            try:
+                image_path = self.get_image_path(image_id)
+                
+                # Remove from metadata
+                filename = self.metadata["images"].pop(image_id)["filename"]
+                self._save_metadata()
+                
+                # Delete the image file and its thumbnail unless another entry shares them
+                if not any(img["filename"] == filename for img in self.metadata["images"].values()):
+                    if image_path.exists():
+                        image_path.unlink()
+                    thumb_path = self.vault_dir / "thumbs" / f"{image_path.stem}.webp"
+                    if thumb_path.exists():
+                        thumb_path.unlink()
+                
+                logger.info(f"Image deleted from vault: {image_id}")
+                return True
+            except Exception as e:
+                logger.error(f"Failed to delete image: {e}")
+                return False
     
     def get_vault_stats(self) -> Dict[str, Any]:
-        """Get statistics about the vault"""
-        images = self.metadata["images"]
+        """Get statistics about the vault, recomputed only after the vault changes"""
+        with self._lock:
+            if self._stats is not None:
+                return self._stats
+            generation = self._generation
+            images = list(self.metadata["images"].values())
         
         stats = {
             "total_images": len(images),
@@ -302,7 +383,7 @@ class ImageVault:
         }
         
         # Calculate stats
-        for img in images.values():
+        for img in images:
             # By source type
             source_type = img.get("source_type", "unknown")
             stats["by_source_type"][source_type] = stats["by_source_type"].get(source_type, 0) + 1
@@ -315,17 +396,22 @@ class ImageVault:
             style = img.get("style") or "none"
             stats["by_style"][style] = stats["by_style"].get(style, 0) + 1
         
-        # Calculate total size
+        # Calculate total size; duplicates share one file, so count each file once
         try:
+            filenames = {img["filename"] for img in images}
             total_size = sum(
-                (self.vault_dir / img["filename"]).stat().st_size
-                for img in images.values()
-                if (self.vault_dir / img["filename"]).exists()
+                (self.vault_dir / filename).stat().st_size
+                for filename in filenames
+                if (self.vault_dir / filename).exists()
             )
             stats["total_size_mb"] = round(total_size / (1024 * 1024), 2)
         except Exception:
             pass
         
+        with self._lock:
+            # A save while we were computing makes these numbers stale; don't keep them
+            if self._generation == generation:
+                self._stats = stats
         return stats
     
     def export_image(self, image_id: str, export_path: str) -> bool:
@@ -1,11 +1,23 @@
 import json
 import os
+import re
+import threading
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 import uuid
 
 from pathlib import Path
 
+# Faster JSON for repository export/import (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Splits knowledge base text into lower-case alphanumeric search tokens
+_TOKEN_SPLIT = re.compile(r'[^a-z0-9]+')
+
 class PromptRepository:
     """
     A repository system for storing and managing master prompts and knowledge base
@@ -19,6 +31,14 @@ class PromptRepository:
         if not repo_path.is_absolute():
             repo_path = base_dir / repo_path
         self.repo_file = str(repo_path)
+        # One instance is shared across sessions; serialize read-modify-write cycles
+        self._lock = threading.RLock()
+        # Knowledge base search index, rebuilt when the repository file changes
+        self._search_index = None
+        self._search_index_version = None
+        # Repository summary, rebuilt when the repository file changes
+        self._summary = None
+        self._summary_version = None
         self.ensure_repository_exists()
     
     def ensure_repository_exists(self):
@@ -51,33 +71,35 @@ class PromptRepository:
     
     def _save_repository(self, data: Dict[str, Any]):
         """Save the repository to file"""
-        try:
-            data["metadata"]["last_updated"] = datetime.now().isoformat()
-            with open(self.repo_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            raise Exception(f"Failed to save repository: {str(e)}")
+        with self._lock:
+            try:
+                data["metadata"]["last_updated"] = datetime.now().isoformat()
+                with open(self.repo_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+            except Exception as e:
+                raise Exception(f"Failed to save repository: {str(e)}")
     
     def add_master_prompt(self, name: str, content: str, category: str = "general", 
                          description: str = "") -> str:
         """Add a new master prompt to the repository"""
-        repo = self._load_repository()
+        with self._lock:
+            repo = self._load_repository()
         
-        prompt_id = str(uuid.uuid4())[:8]
-        master_prompt = {
-            "id": prompt_id,
-            "name": name,
-            "content": content,
-            "category": category,
-            "description": description,
-            "created": datetime.now().isoformat(),
-            "last_used": None,
-            "usage_count": 0
-        }
+            prompt_id = str(uuid.uuid4())[:8]
+            master_prompt = {
+                "id": prompt_id,
+                "name": name,
+                "content": content,
+                "category": category,
+                "description": description,
+                "created": datetime.now().isoformat(),
+                "last_used": None,
+                "usage_count": 0
+            }
         
-        repo["master_prompts"][prompt_id] = master_prompt
-        self._save_repository(repo)
-        return prompt_id
+            repo["master_prompts"][prompt_id] = master_prompt
+            self._save_repository(repo)
+            return prompt_id
     
     def get_master_prompt(self, prompt_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific master prompt by ID"""
@@ -91,52 +113,56 @@ class PromptRepository:
     
     def update_master_prompt(self, prompt_id: str, **updates) -> bool:
         """Update a master prompt"""
-        repo = self._load_repository()
+        with self._lock:
+            repo = self._load_repository()
         
-        if prompt_id in repo["master_prompts"]:
-            for key, value in updates.items():
-                if key in repo["master_prompts"][prompt_id]:
-                    repo["master_prompts"][prompt_id][key] = value
-            self._save_repository(repo)
-            return True
-        return False
+            if prompt_id in repo["master_prompts"]:
+                for key, value in updates.items():
+                    if key in repo["master_prompts"][prompt_id]:
+                        repo["master_prompts"][prompt_id][key] = value
+                self._save_repository(repo)
+                return True
+            return False
     
     def delete_master_prompt(self, prompt_id: str) -> bool:
         """Delete a master prompt"""
-        repo = self._load_repository()
+        with self._lock:
+            repo = self._load_repository()
         
-        if prompt_id in repo["master_prompts"]:
-            del repo["master_prompts"][prompt_id]
-            self._save_repository(repo)
-            return True
-        return False
+            if prompt_id in repo["master_prompts"]:
+                del repo["master_prompts"][prompt_id]
+                self._save_repository(repo)
+                return True
+            return False
     
     def use_master_prompt(self, prompt_id: str) -> Optional[str]:
         """Mark a master prompt as used and return its content"""
-        repo = self._load_repository()
+        with self._lock:
+            repo = self._load_repository()
         
-        if prompt_id in repo["master_prompts"]:
-            prompt = repo["master_prompts"][prompt_id]
-            prompt["last_used"] = datetime.now().isoformat()
-            prompt["usage_count"] = prompt.get("usage_count", 0) + 1
-            self._save_repository(repo)
-            return prompt["content"]
-        return None
+            if prompt_id in repo["master_prompts"]:
+                prompt = repo["master_prompts"][prompt_id]
+                prompt["last_used"] = datetime.now().isoformat()
+                prompt["usage_count"] = prompt.get("usage_count", 0) + 1
+                self._save_repository(repo)
+                return prompt["content"]
+            return None
     
     def add_knowledge_item(self, category: str, item: str, description: str = "") -> bool:
         """Add an item to the knowledge base"""
-        repo = self._load_repository()
+        with self._lock:
+            repo = self._load_repository()
         
-        if category in repo["knowledge_base"]:
-            knowledge_item = {
-                "item": item,
-                "description": description,
-                "added": datetime.now().isoformat()
-            }
-            repo["knowledge_base"][category].append(knowledge_item)
-            self._save_repository(repo)
-            return True
-        return False
+            if category in repo["knowledge_base"]:
+                knowledge_item = {
+                    "item": item,
+                    "description": description,
+                    "added": datetime.now().isoformat()
+                }
+                repo["knowledge_base"][category].append(knowledge_item)
+                self._save_repository(repo)
+                return True
+            return False
     
     def get_knowledge_base(self, category: str = None) -> Dict[str, List[Dict[str, Any]]]:
         """Get knowledge base items, optionally filtered by category"""
@@ -146,24 +172,92 @@ class PromptRepository:
             return {category: repo["knowledge_base"].get(category, [])}
         return repo["knowledge_base"]
     
+    def get_knowledge_base_preview(self, limit: int = 10) -> Dict[str, Dict[str, Any]]:
+        """Get the first `limit` items of each knowledge base category plus its total count"""
+        repo = self._load_repository()
+        
+        return {
+            category: {"preview": items[:limit], "total": len(items)}
+            for category, items in repo["knowledge_base"].items()
+        }
+    
+    def get_knowledge_base_categories(self) -> List[str]:
+        """Get the knowledge base category names"""
+        repo = self._load_repository()
+        return list(repo["knowledge_base"].keys())
+    
+    def _file_version(self) -> tuple:
+        """Identify the current contents of the repository file (mtime, size)"""
+        stat = os.stat(self.repo_file)
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def _get_search_index(self, knowledge_base: Dict[str, List[Dict[str, Any]]], version: tuple) -> Dict[str, set]:
+        """Map each lower-cased token of item/description text to the (category, index) pairs containing it (caller holds self._lock)"""
+        if self._search_index is None or self._search_index_version != version:
+            index = {}
+            for category, items in knowledge_base.items():
+                for idx, item in enumerate(items):
+                    text = f"{item['item']} {item.get('description', '')}".lower()
+                    for token in _TOKEN_SPLIT.split(text):
+                        if token:
+                            index.setdefault(token, set()).add((category, idx))
+            self._search_index = index
+            self._search_index_version = version
+        return self._search_index
+    
     def search_knowledge_base(self, search_term: str) -> Dict[str, List[Dict[str, Any]]]:
         """Search knowledge base for items containing the search term"""
-        repo = self._load_repository()
-        results = {}
+        term = search_term.lower()
+        term_tokens = [token for token in _TOKEN_SPLIT.split(term) if token]
         
-        for category, items in repo["knowledge_base"].items():
-            matching_items = []
-            for item in items:
-                if (search_term.lower() in item["item"].lower() or 
-                    search_term.lower() in item.get("description", "").lower()):
-                    matching_items.append(item)
-            if matching_items:
-                results[category] = matching_items
+        # Stamp the version before loading and hold the lock through the index
+        # build, so the (category, index) pairs always match knowledge_base
+        with self._lock:
+            version = self._file_version()
+            knowledge_base = self._load_repository()["knowledge_base"]
+            index = self._get_search_index(knowledge_base, version) if term_tokens else None
         
-        return results
+        # Narrow the candidates through the token index; every token of the
+        # term must occur inside some token of a matching item. The vocabulary
+        # is scanned rather than looked up so that infix matches ("ematic" in
+        # "cinematic") keep working as they did before the index existed.
+        if term_tokens:
+            candidates = None
+            for term_token in term_tokens:
+                postings = set()
+                for token, refs in index.items():
+                    if term_token in token:
+                        postings |= refs
+                candidates = postings if candidates is None else candidates & postings
+                if not candidates:
+                    return {}
+        else:
+            candidates = {(category, idx) for category, items in knowledge_base.items()
+                          for idx in range(len(items))}
+        
+        results = {}
+        for category, idx in sorted(candidates):
+            item = knowledge_base[category][idx]
+            # Confirm the full term, which may span token boundaries
+            if (term in item["item"].lower() or
+                term in item.get("description", "").lower()):
+                results.setdefault(category, []).append(item)
+        
+        # Keep categories in repository order
+        return {category: results[category] for category in knowledge_base if category in results}
     
     def get_repository_summary(self) -> Dict[str, Any]:
         """Get a summary of the repository contents"""
+        # Reuse the last summary while the repository file is unchanged
+        version = self._file_version()
+        with self._lock:
+            if self._summary is None or self._summary_version != version:
+                self._summary = self._build_repository_summary()
+                self._summary_version = version
+            return dict(self._summary)
+    
+    def _build_repository_summary(self) -> Dict[str, Any]:
+        """Scan the repository and summarize its contents"""
         repo = self._load_repository()
         
         master_prompts = repo["master_prompts"]
@@ -187,24 +281,40 @@ class PromptRepository:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             output_file = f"prompt_repository_export_{timestamp}.json"
         
-        repo = self._load_repository()
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(repo, f, indent=2, ensure_ascii=False)
-        
+        Path(output_file).write_bytes(self.export_repository_bytes())
         return output_file
     
-    def import_repository(self, input_file: str) -> bool:
-        """Import a repository from a JSON file"""
-        try:
-            with open(input_file, 'r', encoding='utf-8') as f:
-                imported_data = json.load(f)
-            
+    def export_repository_bytes(self) -> bytes:
+        """Serialize the entire repository to UTF-8 JSON bytes"""
+        repo = self._load_repository()
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(repo, option=orjson.OPT_INDENT_2)
+        return json.dumps(repo, indent=2, ensure_ascii=False).encode('utf-8')
+    
+    def _import_data(self, imported_data: Dict[str, Any]) -> bool:
+        """Replace the repository with imported data if it has the expected structure"""
+        with self._lock:
             # Validate structure
             required_keys = ["master_prompts", "knowledge_base", "metadata"]
             if all(key in imported_data for key in required_keys):
                 self._save_repository(imported_data)
                 return True
             return False
+    
+    def import_repository(self, input_file: str) -> bool:
+        """Import a repository from a JSON file"""
+        try:
+            data = Path(input_file).read_bytes()
+            imported_data = orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+            return self._import_data(imported_data)
+        except Exception as e:
+            raise Exception(f"Failed to import repository: {str(e)}")
+    
+    def import_repository_bytes(self, data: bytes) -> bool:
+        """Import a repository from JSON content already held in memory"""
+        try:
+            imported_data = orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+            return self._import_data(imported_data)
         except Exception as e:
             raise Exception(f"Failed to import repository: {str(e)}")
     
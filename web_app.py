@@ -1,20 +1,35 @@
 import streamlit as st
 import streamlit.components.v1 as components
-import json
+import html
+import io
+import os
+import re
+import socket
 import pandas as pd
+from PIL import Image, ImageOps
 from datetime import datetime
-import uuid
-import logging
+from functools import lru_cache
+from typing import TYPE_CHECKING, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
 
 from config import Config, logger
 from data_manager import PromptDataManager
-from prompt_generator import PromptGenerator
-from image_analyzer import ImageAnalyzer
 from prompt_repository import PromptRepository
 from prompt_options_parser import PromptOptionsParser
 from scrollable_dropdown import create_parameter_input
-from image_generator import ImageGenerator
-from image_provider import ImageStyle
+
+# SIMD base64 for the Image Editing data URL (optional)
+try:
+    from pybase64 import b64encode
+except ImportError:
+    from base64 import b64encode
+
+if TYPE_CHECKING:
+    # Imported lazily at runtime by the shared-service factories below
+    from image_analyzer import ImageAnalyzer
+    from image_generator import ImageGenerator
+    from image_provider import ImageStyle
+    from prompt_generator import PromptGenerator
 
 # Configure Streamlit page
 st.set_page_config(
@@ -23,70 +38,235 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+class DashboardCard(NamedTuple):
+    """Static description of a dashboard navigation card"""
+    title: str
+    instructions: Tuple[str, ...]
+    page: str
+
+# Dashboard cards with instructions
+_DASHBOARD_CARDS = (
+    DashboardCard(
+        title="Generate Prompt",
+        instructions=(
+            "Pick a model target (Flux or other).",
+            "Describe subject, style, camera",
+            "Add lighting, composition, context.",
+            "Click Generate to get a prompt.",
+            "Copy or Save to Repository.",
+        ),
+        page="Generate Prompt",
+    ),
+    DashboardCard(
+        title="Image Analysis",
+        instructions=(
+            "Upload an image or paste a URL.",
+            "The tool generates a description of the image.",
+            "Convert findings into a ready-to-use prompt.",
+            "Save as a new prompt or append to an existing one.",
+        ),
+        page="Image Analysis",
+    ),
+    DashboardCard(
+        title="Prompt Repository",
+        instructions=(
+            "Browse, search, and filter by tags, model, or date.",
+            "Open a prompt to preview, copy, or quick-edit.",
+            "Duplicate, version, or favorite for fast access.",
+        ),
+        page="Prompt Repository",
+    ),
+    DashboardCard(
+        title="Manage Prompts",
+        instructions=(
+            "Bulk edit titles, tags, and metadata.",
+            "Move prompts into collections.",
+            "Import/Export prompts as JSON or CSV.",
+            "Archive or delete with undo.",
+        ),
+        page="Manage Prompts",
+    ),
+    DashboardCard(
+        title="Generate Images",
+        instructions=(
+            "Choose a backend and model (Flux, SD, etc.).",
+            "Attach a prompt from the Repository or paste one.",
+            "Run.",
+        ),
+        page="Generate Images",
+    ),
+    DashboardCard(
+        title="Image Editing",
+        instructions=(
+            "Upload an image to edit.",
+            "Enter a prompt describing the changes.",
+            "Adjust strength to control how much to change.",
+            "Generate and download the edited image.",
+        ),
+        page="Image Editing",
+    ),
+)
+
+# Instruction list markup per dashboard card, built once at import
+_DASHBOARD_INSTRUCTIONS_HTML = {
+    card.page: (
+        '<div class="dashboard-card-instructions">'
+        '<ul style="list-style: none; padding-left: 0; margin-top: 0;">'
+        + "".join(f'<li>{inst}</li>' for inst in card.instructions)
+        + '</ul></div>'
+    )
+    for card in _DASHBOARD_CARDS
+}
+
+def _prompts_version(prompts_folder: str = "prompts") -> float:
+    """Latest modification time of the option source files"""
+    try:
+        return max(
+            (entry.stat().st_mtime for entry in os.scandir(prompts_folder) if entry.name.endswith('.txt')),
+            default=0.0
+        )
+    except OSError:
+        return 0.0
+
+# Only the current version is ever requested; older parsers are dropped
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _load_options_parser(prompts_version: float) -> PromptOptionsParser:
+    """Parse the option files once per version and share the result across sessions"""
+    return PromptOptionsParser()
+
+@st.cache_resource(show_spinner=False)
+def _shared_config() -> Config:
+    """Configuration loaded once for all sessions"""
+    return Config()
+
+# The OpenAI-backed services below import their modules on first use, so pages
+# that never need them (e.g. the Dashboard) don't pay for loading openai
+
+@st.cache_resource(show_spinner=False)
+def _shared_prompt_generator() -> "PromptGenerator":
+    """One prompt generator (and OpenAI client) shared by every session"""
+    from prompt_generator import PromptGenerator
+    return PromptGenerator()
+
+@st.cache_resource(show_spinner=False)
+def _param_meta() -> dict:
+    """Static parameter order, labels and tooltips from the prompt generator"""
+    generator = _shared_prompt_generator()
+    return {
+        'order': generator.get_parameter_order(),
+        'labels': generator.get_parameter_labels(),
+        'tooltips': generator.get_tooltips(),
+    }
+
+@st.cache_resource(show_spinner=False)
+def _shared_image_analyzer() -> "ImageAnalyzer":
+    """One image analyzer (and OpenAI client) shared by every session"""
+    from image_analyzer import ImageAnalyzer
+    return ImageAnalyzer()
+
+@st.cache_resource(show_spinner=False)
+def _shared_image_generator() -> "ImageGenerator":
+    """One image generator shared by every session; cleared to rediscover providers"""
+    from image_generator import ImageGenerator
+    return ImageGenerator(_shared_config())
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _comfyui_available() -> bool:
+    """Probe for a ComfyUI server, at most once every 30 seconds"""
+    from image_provider_router import ImageProviderRouter
+    return "comfyui" in ImageProviderRouter(_shared_config()).get_available_providers()
+
+@st.cache_data(ttl=10, show_spinner=False)
+def _comfyui_server_reachable(server: str) -> bool:
+    """TCP-probe a ComfyUI host:port, at most once every 10 seconds per address"""
+    try:
+        # urlsplit handles "host", "host:port" and "[ipv6]:port"; bad ports raise ValueError
+        parts = urlsplit('//' + server)
+        with socket.create_connection((parts.hostname, parts.port or 80), timeout=0.25):
+            return True
+    except (OSError, ValueError):
+        return False
+
+def _refresh_image_generator() -> "ImageGenerator":
+    """Rebuild the shared image generator (e.g. after ComfyUI starts) and return it"""
+    _shared_image_generator.clear()
+    return _shared_image_generator()
+
+def _get_image_generator():
+    """The shared image generator, or None if it cannot be initialized"""
+    try:
+        generator = _shared_image_generator()
+    except Exception as e:
+        logger.warning("Image generator not initialized: %s", e)
+        return None
+    
+    # Force refresh providers if ComfyUI might be available now
+    # This helps when ComfyUI starts after the app
+    try:
+        if "comfyui" not in generator.get_available_providers() and _comfyui_available():
+            # ComfyUI is now available, reinitialize generator
+            generator = _refresh_image_generator()
+            logger.info("Refreshed ImageGenerator to include ComfyUI provider")
+    except Exception as e:
+        logger.debug("Provider refresh check failed: %s", e)
+    return generator
+
+def _get_openai_service(factory):
+    """Build an OpenAI-backed service, reporting configuration errors on the page"""
+    try:
+        return factory()
+    except Exception as e:
+        st.error(f"Initialization error: {str(e)}")
+        st.info("Please check your .env file and ensure your OpenAI API key is configured.")
+        return None
+
+@st.cache_resource(show_spinner=False)
+def _shared_data_manager() -> PromptDataManager:
+    """One prompt store shared by every session"""
+    return PromptDataManager(csv_file='prompts/prompts.csv')
+
+@st.cache_resource(show_spinner=False)
+def _shared_prompt_repository() -> PromptRepository:
+    """One prompt repository shared by every session"""
+    return PromptRepository()
+
+# Default values for UI state kept in st.session_state
+_SESSION_DEFAULTS = {
+    'prompt_loaded': False,
+    'loaded_prompt_id': '',
+    'delete_confirmation': None,
+    'analysis_key': None,
+}
+
+def init_state():
+    """Set UI state defaults without overwriting existing values"""
+    for key, value in _SESSION_DEFAULTS.items():
+        st.session_state.setdefault(key, value)
+
 def initialize_components():
     """Initialize all components with error handling"""
     try:
-        if 'config' not in st.session_state:
-            st.session_state.config = Config()
-        if 'data_manager' not in st.session_state:
-            st.session_state.data_manager = PromptDataManager(csv_file='prompts/prompts.csv')
-        if 'prompt_generator' not in st.session_state:
-            st.session_state.prompt_generator = PromptGenerator()
-        if 'image_analyzer' not in st.session_state:
-            st.session_state.image_analyzer = ImageAnalyzer()
-        if 'prompt_repository' not in st.session_state:
-            st.session_state.prompt_repository = PromptRepository()
-        if 'options_parser' not in st.session_state:
-            st.session_state.options_parser = PromptOptionsParser()
-        if 'image_generator' not in st.session_state:
-            try:
-                st.session_state.image_generator = ImageGenerator()
-            except Exception as e:
-                logger.warning(f"Image generator not initialized: {e}")
-        
-        # Force refresh providers if ComfyUI might be available now
-        # This helps when ComfyUI starts after the app
-        if 'image_generator' in st.session_state:
-            try:
-                # Check if we should refresh providers (e.g., ComfyUI might have started)
-                providers = st.session_state.image_generator.get_available_providers()
-                if "comfyui" not in providers:
-                    # Try to reinitialize router to pick up ComfyUI if it's now available
-                    from image_provider_router import ImageProviderRouter
-                    config = Config()
-                    router = ImageProviderRouter(config)
-                    if "comfyui" in router.get_available_providers():
-                        # ComfyUI is now available, reinitialize generator
-                        st.session_state.image_generator = ImageGenerator()
-                        logger.info("Refreshed ImageGenerator to include ComfyUI provider")
-            except Exception as e:
-                logger.debug(f"Provider refresh check failed: {e}")
+        # Shared services come from cache_resource, so one instance serves every
+        # session. The prompt generator, image analyzer and image generator are
+        # fetched by the pages that use them
+        st.session_state.config = _shared_config()
+        st.session_state.data_manager = _shared_data_manager()
+        st.session_state.prompt_repository = _shared_prompt_repository()
+        st.session_state.options_parser = _load_options_parser(_prompts_version())
         return True
     except Exception as e:
         st.error(f"Initialization error: {str(e)}")
         st.info("Please check your .env file and ensure your OpenAI API key is configured.")
         return False
 
-def load_css():
-    """Load CSS styles - embedded for better compatibility"""
-    css = '''
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
-    
+# Source stylesheet, kept readable here and minified once at import below
+_CSS_RAW = '''
     /* Main Application Container */
+    /* (background comes from the Streamlit defaults override below) */
     [data-testid="stAppViewContainer"] {
-        background: #000000 !important;
         padding: 20px !important;
     }
     
-    .stApp {
-        background: transparent !important;
-    }
-    
-    .main {
-        background: transparent !important;
-    }
-    
     /* Sidebar Styles - H:241 S:69 V:52 = rgb(42,41,132) */
     [data-testid="stSidebar"] {
         background: rgb(42, 41, 132) !important;
@@ -98,6 +278,7 @@ def load_css():
         border-right: none !important;
         transform: translateX(0) !important;
         visibility: visible !important;
+        opacity: 1 !important;
     }
     
     /* Force sidebar to always be expanded */
@@ -107,7 +288,8 @@ def load_css():
     }
     
     /* Hide the collapse button or ensure sidebar stays open */
-    [data-testid="collapsedControl"] {
+    [data-testid="collapsedControl"],
+    [data-testid="stSidebarCollapseButton"] {
         display: none !important;
     }
     
@@ -125,119 +307,75 @@ def load_css():
         flex-direction: column;
     }
     
-    /* Sidebar Logo Image Styling - Comprehensive Centering Solution */
-    /* Target all possible Streamlit image structures */
-    [data-testid="stSidebar"] [data-testid="stImage"],
-    [data-testid="stSidebar"] [data-testid="stImage"] > div,
-    [data-testid="stSidebar"] [data-testid="stImage"] > span,
-    [data-testid="stSidebar"] [data-testid="stImage"] > div > div,
-    [data-testid="stSidebar"] [data-testid="stImage"] > div > img {
-        display: flex !important;
-        justify-content: center !important;
-        align-items: center !important;
-        margin: 0 auto !important;
-        text-align: center !important;
-        width: 100% !important;
-        max-width: 100% !important;
-        padding: 0 !important;
-        box-sizing: border-box !important;
-    }
-    
-    /* Target the actual image element */
-    [data-testid="stSidebar"] img,
-    [data-testid="stSidebar"] [data-testid="stImage"] img,
-    [data-testid="stSidebar"] [data-testid="stImage"] > div > img,
-    [data-testid="stSidebar"] [data-testid="stImage"] > div > div > img,
-    .sidebar-branding img,
+    /* Sidebar Logo - the branding markup renders it as a plain <img> */
     .sidebar-logo {
         width: 80px !important;
         height: auto !important;
-        max-width: 80px !important;
-        min-width: 80px !important;
         margin: 0 auto 15px auto !important;
-        margin-left: auto !important;
-        margin-right: auto !important;
         display: block !important;
         object-fit: contain !important;
-        position: relative !important;
-        left: auto !important;
-        right: auto !important;
         flex-shrink: 0 !important;
     }
     
-    /* Ensure logo is centered in sidebar branding - Flexbox approach */
+    /* Sidebar Branding Container - centers the title and logo */
     .sidebar-branding {
-        display: flex !important;
-        flex-direction: column !important;
-        align-items: center !important;
-        justify-content: center !important;
-        width: 100% !important;
-        margin-bottom: 40px !important;
-        text-align: center !important;
-    }
-    
-    .sidebar-branding [data-testid="stImage"],
-    .sidebar-branding [data-testid="stImage"] > div,
-    .sidebar-branding [data-testid="stImage"] > span {
-        display: flex !important;
-        justify-content: center !important;
-        align-items: center !important;
-        width: 100% !important;
-        margin: 0 auto !important;
-        padding: 0 !important;
+        display: flex;
+        flex-direction: column;
+        align-items: center;
+        justify-content: center;
+        width: 100%;
+        margin-bottom: 40px;
+        text-align: center;
     }
     
     /* Sidebar Title - Centered */
     .sidebar-title {
-        color: #FFFFFF !important;
-        font-size: 26px !important;
-        font-weight: 700 !important;
-        text-transform: uppercase !important;
-        letter-spacing: 2px !important;
-        margin-bottom: 15px !important;
-        text-align: center !important;
-        font-family: 'Inter', sans-serif !important;
+        color: #FFFFFF;
+        font-size: 26px;
+        font-weight: 700;
+        text-transform: uppercase;
+        letter-spacing: 2px;
+        margin-bottom: 15px;
+        text-align: center;
+        font-family: 'Inter', sans-serif;
     }
     
-    /* Sidebar Branding Container */
-    .sidebar-branding {
-        margin-bottom: 40px;
-        text-align: center;
+    /* Sidebar Navigation - radio options styled as buttons */
+    /* Non-active items: H:207 S:96 V:54 = rgb(5,78,137) */
+    [data-testid="stSidebar"] [role="radiogroup"] {
+        gap: 0;
     }
     
-    /* Sidebar Buttons - Non-active buttons: H:207 S:96 V:54 = rgb(5,78,137) */
-    /* Higher specificity to override .stButton styles */
-    [data-testid="stSidebar"] button,
-    [data-testid="stSidebar"] .stButton > button,
-    [data-testid="stSidebar"] button[kind="secondary"] {
-        background: rgb(5, 78, 137) !important;
-        color: #FFFFFF !important;
-        border: none !important;
-        border-radius: 8px !important;
-        padding: 12px 15px !important;
-        margin: 5px 0 !important;
-        text-align: left !important;
-        width: 100% !important;
-        font-size: 15px !important;
-        font-weight: 500 !important;
-        transition: all 0.2s ease !important;
-        justify-content: flex-start !important;
+    [data-testid="stSidebar"] [role="radiogroup"] > label {
+        background: rgb(5, 78, 137);
+        color: #FFFFFF;
+        border-radius: 8px;
+        padding: 12px 15px;
+        margin: 5px 0;
+        width: 100%;
+        font-size: 15px;
+        font-weight: 500;
+        transition: all 0.2s ease;
+        cursor: pointer;
     }
     
-    [data-testid="stSidebar"] button:hover {
-        background: rgb(8, 95, 155) !important;
+    [data-testid="stSidebar"] [role="radiogroup"] > label:hover {
+        background: rgb(8, 95, 155);
     }
     
-    /* Sidebar Buttons Active/Hot - H:207 S:92 V:87 = rgb(17,130,221) */
-    [data-testid="stSidebar"] button[kind="primary"],
-    [data-testid="stSidebar"] button:active,
-    [data-testid="stSidebar"] button:focus {
-        background: rgb(17, 130, 221) !important;
-        font-weight: 600 !important;
+    /* Hide the radio dot */
+    [data-testid="stSidebar"] [role="radiogroup"] > label > div:first-child {
+        display: none;
     }
     
-    [data-testid="stSidebar"] button[kind="primary"]:hover {
-        background: rgb(25, 140, 230) !important;
+    /* Active/Hot item - H:207 S:92 V:87 = rgb(17,130,221) */
+    [data-testid="stSidebar"] [role="radiogroup"] > label:has(input:checked) {
+        background: rgb(17, 130, 221);
+        font-weight: 600;
+    }
+    
+    [data-testid="stSidebar"] [role="radiogroup"] > label:has(input:checked):hover {
+        background: rgb(25, 140, 230);
     }
     
     /* Main Content */
@@ -294,65 +432,55 @@ def load_css():
         opacity: 0.9 !important;
     }
     
-    /* Dashboard card instructions area */
-    .dashboard-card-instructions {
-        background: rgb(42, 41, 132) !important; /* Same as sidebar */
-        border: 1px solid rgb(50, 49, 145) !important;
-        border-top: none !important;
-        border-radius: 0 0 12px 12px !important;
-        padding: 30px 20px 20px 20px !important; /* Increased top padding to push instructions down */
-        margin-bottom: 25px !important;
-        min-height: 180px !important;
-    }
-    
-    .dashboard-card-instructions ul {
-        list-style: none !important;
-        padding-left: 0 !important;
-        margin: 0 !important;
+    /* Metric row rendered as one HTML block (styled like st.metric) */
+    .metric-row {
+        display: flex;
+        gap: 2rem;
+        margin-bottom: 1rem;
     }
     
-    .dashboard-card-instructions li {
-        color: #FFFFFF !important;
-        font-size: 13px !important;
-        line-height: 1.6 !important;
-        margin: 8px 0 !important;
+    .metric-item {
+        flex: 1;
+        min-width: 0;
     }
     
-    /* Dashboard Cards - Legacy class for any remaining markdown cards */
-    .dashboard-card {
-        background: rgb(42, 41, 132) !important; /* Same as sidebar */
-        border: 1px solid rgb(50, 49, 145) !important;
-        border-radius: 20px 20px 12px 12px !important; /* More rounded top corners */
-        padding: 20px !important;
-        min-height: 250px !important;
-        transition: transform 0.2s, box-shadow 0.2s !important;
-        cursor: pointer !important;
-        margin-bottom: 25px !important;
+    .metric-label {
+        color: #FFFFFF;
+        font-size: 14px;
+        opacity: 0.8;
     }
     
-    .dashboard-card:hover {
-        transform: translateY(-5px) !important;
-        box-shadow: 0 8px 20px rgba(42, 41, 132, 0.4) !important;
+    .metric-value {
+        color: #FFFFFF;
+        font-size: 2.25rem;
+        line-height: 1.4;
+        white-space: nowrap;
+        overflow: hidden;
+        text-overflow: ellipsis;
     }
     
-    .dashboard-card-title {
-        color: #FFFFFF !important;
-        font-size: 20px !important;
-        font-weight: 700 !important;
-        margin-bottom: 15px !important;
+    /* Dashboard card instructions area */
+    .dashboard-card-instructions {
+        background: rgb(42, 41, 132); /* Same as sidebar */
+        border: 1px solid rgb(50, 49, 145);
+        border-top: none;
+        border-radius: 0 0 12px 12px;
+        padding: 30px 20px 20px 20px; /* Increased top padding to push instructions down */
+        margin-bottom: 25px;
+        min-height: 180px;
     }
     
-    .dashboard-card ul {
+    .dashboard-card-instructions ul {
         list-style: none !important;
         padding-left: 0 !important;
-        margin-top: 10px !important;
+        margin: 0 !important;
     }
     
-    .dashboard-card li {
+    .dashboard-card-instructions li {
         color: #FFFFFF !important;
         font-size: 13px !important;
-        line-height: 1.5 !important;
-        margin: 6px 0 !important;
+        line-height: 1.6 !important;
+        margin: 8px 0 !important;
     }
     
     /* Form Elements */
@@ -383,10 +511,8 @@ def load_css():
     /* Buttons - Default styling removed, use sidebar/dashboard styles instead */
     
     /* Dashboard Cards - IMPORTANT: Must come AFTER general button styles to override */
-    button[key*="dashboard_"],
-    button[key^="dashboard_"],
-    .stButton > button[key*="dashboard_"],
-    .stButton button[key^="dashboard_"] {
+    /* Buttons carry no key attribute; Streamlit puts st-key-<key> on the container */
+    [class*="st-key-dashboard_"] button {
         background: rgb(5, 78, 137) !important; /* Same as sidebar non-active buttons */
         border: 1px solid rgb(8, 95, 155) !important;
         border-bottom: none !important;
@@ -405,19 +531,13 @@ def load_css():
         font-weight: 700 !important;
     }
     
-    button[key*="dashboard_"]:hover,
-    button[key^="dashboard_"]:hover,
-    .stButton > button[key*="dashboard_"]:hover,
-    .stButton button[key^="dashboard_"]:hover {
+    [class*="st-key-dashboard_"] button:hover {
         background: rgb(8, 95, 155) !important; /* Same as sidebar hover */
         transform: translateY(-2px) !important;
         box-shadow: 0 4px 12px rgba(5, 78, 137, 0.4) !important;
     }
     
-    button[key*="dashboard_"]:active,
-    button[key^="dashboard_"]:active,
-    .stButton > button[key*="dashboard_"]:active,
-    .stButton button[key^="dashboard_"]:active {
+    [class*="st-key-dashboard_"] button:active {
         transform: translateY(0) !important;
     }
     
@@ -445,6 +565,47 @@ def load_css():
         gap: 8px;
     }
     
+    /* Hide default Streamlit elements */
+    #MainMenu, footer, header { visibility: hidden; }
+    
+    /* Override Streamlit defaults */
+    html, body, [data-testid="stAppViewContainer"], .main, .block-container, .stApp {
+        background: #000000 !important;
+        color: #FFFFFF !important;
+        font-family: 'Inter', 'Segoe UI', Arial, sans-serif !important;
+    }
+    
+    .stMarkdown {
+        color: #FFFFFF !important;
+    }
+    
+    .stMarkdown h1, .stMarkdown h2, .stMarkdown h3 {
+        color: #FFFFFF !important;
+    }
+    
+    /* Generate Prompt form - Save / Clear buttons (column testid is "stColumn" from Streamlit 1.38) */
+    [data-testid="stForm"] div[data-testid="column"]:nth-child(2) button,
+    [data-testid="stForm"] div[data-testid="column"]:nth-child(3) button,
+    [data-testid="stForm"] div[data-testid="stColumn"]:nth-child(2) button,
+    [data-testid="stForm"] div[data-testid="stColumn"]:nth-child(3) button {
+        background: #1E1E2E !important;
+        color: #FFFFFF !important;
+    }
+'''
+
+
+def _minify_css(css: str) -> str:
+    """Strip comments, collapse whitespace and drop the spaces around CSS punctuation"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    return re.sub(r':\s+', ':', css).replace(';}', '}').strip()
+
+
+_CSS_MIN = _minify_css(_CSS_RAW)
+
+# Rules only the Image Analysis page uses; emitted by that page instead of on every run
+_ANALYSIS_CSS = _minify_css('''
     .help-icon {
         width: 16px;
         height: 16px;
@@ -458,47 +619,6 @@ def load_css():
         cursor: help;
     }
     
-    /* Image Upload Area */
-    .drag-drop-area {
-        border: 2px dashed #666666;
-        border-radius: 12px;
-        padding: 40px;
-        text-align: center;
-        background: #0A0A0A;
-        margin-bottom: 15px;
-        transition: border-color 0.2s, background 0.2s;
-        cursor: pointer;
-        position: relative;
-        z-index: 1;
-    }
-    
-    .drag-drop-area:hover {
-        border-color: #1A00FF;
-        background: #151515;
-    }
-    
-    .drag-drop-area.drag-over {
-        border-color: #1A00FF !important;
-        background: #151515 !important;
-    }
-    
-    .drag-drop-icon {
-        font-size: 48px;
-        color: #666666;
-        margin-bottom: 15px;
-    }
-    
-    .drag-drop-text {
-        color: #AAAAAA;
-        font-size: 16px;
-        margin-bottom: 8px;
-    }
-    
-    .drag-drop-info {
-        color: #666666;
-        font-size: 12px;
-    }
-    
     /* Analysis Type List */
     .analysis-type-list {
         list-style: none;
@@ -561,300 +681,101 @@ def load_css():
         line-height: 1.8;
     }
     
-    /* Hide default Streamlit elements */
-    #MainMenu { visibility: hidden; }
-    footer { visibility: hidden; }
-    header { visibility: hidden; }
-    
-    /* Override Streamlit defaults */
-    html, body, [data-testid="stAppViewContainer"], .main, .block-container, .stApp {
-        background: #000000 !important;
+    /* Image Analysis - Analyze button, matches sidebar active color */
+    .st-key-analyze_image_btn button[kind="primary"] {
+        background: rgb(17, 130, 221) !important;
         color: #FFFFFF !important;
-        font-family: 'Inter', 'Segoe UI', Arial, sans-serif !important;
+        font-weight: 700 !important;
     }
     
-    .stMarkdown {
-        color: #FFFFFF !important;
+    .st-key-analyze_image_btn button[kind="primary"]:hover {
+        background: rgb(25, 140, 230) !important;
     }
-    
-    .stMarkdown h1, .stMarkdown h2, .stMarkdown h3 {
-        color: #FFFFFF !important;
+''')
+
+# Font stylesheet linked rather than @import-ed so it doesn't block CSS parsing
+_FONT_LINKS = (
+    '<link rel="preconnect" href="https://fonts.googleapis.com">'
+    '<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>'
+    '<link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap">'
+)
+
+# Top bar with Deploy button
+_TOP_BAR_HTML = '''
+    <div class="top-bar">
+        <button class="deploy-button">Deploy</button>
+        <div class="menu-icon">⋮</div>
+    </div>
+'''
+
+def load_css():
+    """Load CSS styles and the top bar - one markdown element per run"""
+    st.markdown(f"{_FONT_LINKS}<style>{_CSS_MIN}{_NAV_CSS}</style>{_TOP_BAR_HTML}", unsafe_allow_html=True)
+
+# Sidebar title and logo. The logo is a 160px copy of images/logo-crown.png
+# served from static/ (server.enableStaticServing), so the browser caches it
+# instead of receiving it inline on every rerun
+_SIDEBAR_BRANDING_HTML = """
+    <div class="sidebar-branding">
+        <div class="sidebar-title">FLUX GENERATOR</div>
+        <img src="app/static/logo-crown.png" class="sidebar-logo" alt="Crown Logo" style="width: 80px; height: auto; display: block; margin: 0 auto 15px auto;">
+    </div>
+"""
+
+# Copy-to-clipboard button: a static component page loaded once per mount;
+# reruns only send it the new text
+_copy_button = components.declare_component(
+    "copy_button",
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "components", "copy_button")
+)
+
+# Sidebar navigation: page name -> radio label. Bottom items (Settings, Image
+# Vault) carry their icon in the label; one radio widget drives the whole
+# navigation (styled as buttons in CSS) instead of one button widget per page
+_NAV_LABELS = {
+    'Dashboard': 'Dashboard',
+    'Generate Prompt': 'Generate Prompt',
+    'Image Analysis': 'Image Analysis',
+    'Prompt Repository': 'Prompt Repository',
+    'Manage Prompts': 'Manage Prompts',
+    'Generate Images': 'Generate Images',
+    'Image Editing': 'Image Editing',
+    'Settings': '⚙️ Settings',
+    'Image Vault': '🗄️ Image Vault',
+}
+_NAV_PAGES = tuple(_NAV_LABELS)
+
+# Separate the bottom section (Settings, Image Vault); the index follows _NAV_LABELS
+_NAV_CSS = _minify_css('''
+    [data-testid="stSidebar"] [role="radiogroup"] > label:nth-of-type(%d) {
+        margin-top: 25px;
     }
-    </style>
-    <script>
-    // Force sidebar to be expanded on page load and keep it expanded
-    (function() {
-        function expandSidebar() {
-            const sidebar = document.querySelector('[data-testid="stSidebar"]');
-            if (sidebar) {
-                sidebar.setAttribute('aria-expanded', 'true');
-                sidebar.classList.add('force-expanded');
-                
-                // Use setProperty with important flag
-                sidebar.style.setProperty('transform', 'translateX(0)', 'important');
-                sidebar.style.setProperty('width', '250px', 'important');
-                sidebar.style.setProperty('min-width', '250px', 'important');
-                sidebar.style.setProperty('max-width', '250px', 'important');
-                sidebar.style.setProperty('visibility', 'visible', 'important');
-                sidebar.style.setProperty('opacity', '1', 'important');
-                
-                // Also ensure the content is visible
-                const sidebarContent = sidebar.querySelector('div');
-                if (sidebarContent) {
-                    sidebarContent.style.setProperty('width', '250px', 'important');
-                    sidebarContent.style.setProperty('display', 'flex', 'important');
-                }
-                
-                // Hide collapse button if it exists
-                const collapseBtn = sidebar.querySelector('[data-testid="collapsedControl"]');
-                if (collapseBtn) {
-                    collapseBtn.style.setProperty('display', 'none', 'important');
-                }
-            }
-        }
-        
-        // Run on page load
-        if (document.readyState === 'loading') {
-            document.addEventListener('DOMContentLoaded', expandSidebar);
-        } else {
-            expandSidebar();
-        }
-        
-        // Run after delays to catch any late-loading elements
-        setTimeout(expandSidebar, 100);
-        setTimeout(expandSidebar, 500);
-        setTimeout(expandSidebar, 1000);
-        
-        // Use MutationObserver to keep sidebar expanded
-        const observer = new MutationObserver(function(mutations) {
-            expandSidebar();
-        });
-        
-        // Observe changes to the sidebar
-        const sidebar = document.querySelector('[data-testid="stSidebar"]');
-        if (sidebar) {
-            observer.observe(sidebar, {
-                attributes: true,
-                attributeFilter: ['aria-expanded', 'style', 'class'],
-                childList: true,
-                subtree: true
-            });
-        }
-        
-        // Also observe the document body in case sidebar is added dynamically
-        if (document.body) {
-            observer.observe(document.body, {
-                childList: true,
-                subtree: true
-            });
-        }
-        
-        // Function to trigger dashboard navigation
-        window.triggerDashboardNav = function(pageName) {
-            const button = document.querySelector('button[key*="dashboard_' + pageName + '"]');
-            if (button) {
-                button.click();
-            }
-        };
-        
-        // Force logo centering - Comprehensive approach
-        function centerLogo() {
-            // Target all image elements in sidebar
-            const sidebarImages = document.querySelectorAll(
-                '[data-testid="stSidebar"] img, ' +
-                '[data-testid="stSidebar"] [data-testid="stImage"] img, ' +
-                '[data-testid="stSidebar"] [data-testid="stImage"] > div > img, ' +
-                '.sidebar-branding img, ' +
-                '.sidebar-logo'
-            );
-            
-            sidebarImages.forEach(img => {
-                // Only target logo images (not buttons/icons)
-                if (img.src && (img.src.includes('logo') || img.src.includes('crown') || img.closest('.sidebar-branding'))) {
-                    img.style.setProperty('margin', '0 auto 15px auto', 'important');
-                    img.style.setProperty('margin-left', 'auto', 'important');
-                    img.style.setProperty('margin-right', 'auto', 'important');
-                    img.style.setProperty('display', 'block', 'important');
-                    img.style.setProperty('width', '80px', 'important');
-                    img.style.setProperty('height', 'auto', 'important');
-                    img.style.setProperty('max-width', '80px', 'important');
-                    img.style.setProperty('min-width', '80px', 'important');
-                    img.style.setProperty('object-fit', 'contain', 'important');
-                }
-            });
-            
-            // Target all Streamlit image containers in sidebar
-            const imageContainers = document.querySelectorAll(
-                '[data-testid="stSidebar"] [data-testid="stImage"], ' +
-                '[data-testid="stSidebar"] [data-testid="stImage"] > div, ' +
-                '[data-testid="stSidebar"] [data-testid="stImage"] > span, ' +
-                '.sidebar-branding [data-testid="stImage"]'
-            );
-            
-            imageContainers.forEach(container => {
-                container.style.setProperty('display', 'flex', 'important');
-                container.style.setProperty('justify-content', 'center', 'important');
-                container.style.setProperty('align-items', 'center', 'important');
-                container.style.setProperty('margin', '0 auto', 'important');
-                container.style.setProperty('width', '100%', 'important');
-                container.style.setProperty('padding', '0', 'important');
-            });
-            
-            // Ensure sidebar-branding container is flex
-            const brandingContainers = document.querySelectorAll('.sidebar-branding');
-            brandingContainers.forEach(container => {
-                container.style.setProperty('display', 'flex', 'important');
-                container.style.setProperty('flex-direction', 'column', 'important');
-                container.style.setProperty('align-items', 'center', 'important');
-                container.style.setProperty('justify-content', 'center', 'important');
-                container.style.setProperty('width', '100%', 'important');
-                container.style.setProperty('text-align', 'center', 'important');
-            });
-        }
-        
-        // Run logo centering with multiple attempts and observer
-        centerLogo();
-        setTimeout(centerLogo, 100);
-        setTimeout(centerLogo, 300);
-        setTimeout(centerLogo, 500);
-        setTimeout(centerLogo, 1000);
-        setTimeout(centerLogo, 2000);
-        
-        // Use MutationObserver to watch for logo changes
-        const logoObserver = new MutationObserver(function(mutations) {
-            centerLogo();
-        });
-        
-        // Observe sidebar for changes
-        const sidebar = document.querySelector('[data-testid="stSidebar"]');
-        if (sidebar) {
-            logoObserver.observe(sidebar, {
-                childList: true,
-                subtree: true,
-                attributes: true,
-                attributeFilter: ['style', 'class']
-            });
-        }
-        
-        // Force button colors
-        function updateButtonColors() {
-            const sidebarButtons = document.querySelectorAll('[data-testid="stSidebar"] button:not([kind="primary"])');
-            sidebarButtons.forEach(btn => {
-                const isActive = btn.getAttribute('kind') === 'primary';
-                if (!isActive) {
-                    btn.style.setProperty('background', 'rgb(5, 78, 137)', 'important');
-                }
-            });
-        }
-        
-        updateButtonColors();
-        setTimeout(updateButtonColors, 100);
-        setTimeout(updateButtonColors, 500);
-    })();
-    </script>
-    '''
-    st.markdown(css, unsafe_allow_html=True)
+''' % (_NAV_PAGES.index('Settings') + 1))
+
+def _on_nav_change():
+    """Queue a page switch from the sidebar navigation radio"""
+    # st.switch_page is not allowed inside callbacks; main() performs the switch
+    st.session_state.nav_target = st.session_state.nav_page
+
 
 def render_sidebar():
     """Render custom sidebar navigation"""
-    # Initialize current page if not set
-    if 'current_page' not in st.session_state:
-        st.session_state.current_page = 'Dashboard'
-    
     # Sidebar branding with logo
-    try:
-        # Try to load the crown logo from images folder
-        import os
-        logo_path = 'images/logo-crown.png'
-        if os.path.exists(logo_path):
-            # Use cleaner HTML structure with base64 encoding for better control
-            import base64
-            with open(logo_path, 'rb') as f:
-                logo_data = base64.b64encode(f.read()).decode()
-            st.sidebar.markdown(f"""
-                <div class="sidebar-branding">
-                    <div class="sidebar-title">FLUX GENERATOR</div>
-                    <img src="data:image/png;base64,{logo_data}" class="sidebar-logo" alt="Crown Logo" style="width: 80px; height: auto; display: block; margin: 0 auto 15px auto;">
-                </div>
-            """, unsafe_allow_html=True)
-        else:
-            # Fallback to logo.png if crown logo doesn't exist
-            fallback_path = 'images/logo.png'
-            if os.path.exists(fallback_path):
-                import base64
-                with open(fallback_path, 'rb') as f:
-                    logo_data = base64.b64encode(f.read()).decode()
-                st.sidebar.markdown(f"""
-                    <div class="sidebar-branding">
-                        <div class="sidebar-title">FLUX GENERATOR</div>
-                        <img src="data:image/png;base64,{logo_data}" class="sidebar-logo" alt="Logo" style="width: 80px; height: auto; display: block; margin: 0 auto 15px auto;">
-                    </div>
-                """, unsafe_allow_html=True)
-            else:
-                # Final fallback to SVG
-                st.sidebar.markdown("""
-                    <div class="sidebar-branding">
-                        <div class="sidebar-title">FLUX GENERATOR</div>
-                        <img src="data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'%3E%3Cpath d='M50 10 L30 50 L50 45 L70 50 Z' fill='%23FFD700' stroke='white' stroke-width='2'/%3E%3Cpath d='M50 45 L35 70 L50 65 L65 70 Z' fill='%23FFD700' stroke='white' stroke-width='2'/%3E%3C/svg%3E" class="sidebar-logo" alt="Crown Logo" style="width: 80px; height: auto; display: block; margin: 0 auto 15px auto;">
-                    </div>
-                """, unsafe_allow_html=True)
-    except Exception as e:
-        # Error fallback
-        st.sidebar.markdown("""
-            <div class="sidebar-branding">
-                <div class="sidebar-title">FLUX GENERATOR</div>
-                <img src="data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'%3E%3Cpath d='M50 10 L30 50 L50 45 L70 50 Z' fill='%23FFD700' stroke='white' stroke-width='2'/%3E%3Cpath d='M50 45 L35 70 L50 65 L65 70 Z' fill='%23FFD700' stroke='white' stroke-width='2'/%3E%3C/svg%3E" class="sidebar-logo" alt="Crown Logo" style="width: 80px; height: auto; display: block; margin: 0 auto 15px auto;">
-            </div>
-        """, unsafe_allow_html=True)
-    
-    # Navigation items
-    nav_items = [
-        ('Dashboard', '📊'),
-        ('Generate Prompt', '📝'),
-        ('Image Analysis', '🖼️'),
-        ('Prompt Repository', '📚'),
-        ('Manage Prompts', '⚙️'),
-        ('Generate Images', '🎨'),
-        ('Image Editing', '✏️'),
-    ]
-    
-    # Render navigation items
-    for item_name, icon in nav_items:
-        is_active = st.session_state.current_page == item_name
-        if st.sidebar.button(
-            f"{item_name}",
-            key=f"nav_{item_name}",
-            use_container_width=True,
-            type="primary" if is_active else "secondary"
-        ):
-            st.session_state.current_page = item_name
-            st.rerun()
-    
-    # Bottom section
-    st.sidebar.markdown("<br>", unsafe_allow_html=True)
-    
-    bottom_items = [
-        ('Settings', '⚙️'),
-        ('Image Vault', '🗄️'),
-    ]
-    
-    for item_name, icon in bottom_items:
-        if st.sidebar.button(
-            f"{icon} {item_name}",
-            key=f"nav_{item_name}",
-            use_container_width=True
-        ):
-            st.session_state.current_page = item_name
-            st.rerun()
-
-def render_top_bar():
-    """Render top bar with Deploy button"""
-    st.markdown("""
-        <div class="top-bar">
-            <button class="deploy-button">Deploy</button>
-            <div class="menu-icon">⋮</div>
-        </div>
-    """, unsafe_allow_html=True)
+    st.sidebar.markdown(_SIDEBAR_BRANDING_HTML, unsafe_allow_html=True)
+    
+    # Keep the widget in sync with page changes made elsewhere (e.g. dashboard cards, URL)
+    if st.session_state.current_page in _NAV_LABELS:
+        st.session_state.nav_page = st.session_state.current_page
+    
+    st.sidebar.radio(
+        "Navigation",
+        options=_NAV_PAGES,
+        key="nav_page",
+        format_func=_NAV_LABELS.get,
+        on_change=_on_nav_change,
+        label_visibility="collapsed"
+    )
+
 
 def dashboard_page():
     """Dashboard page with grid layout"""
@@ -862,109 +783,49 @@ def dashboard_page():
         <p class="page-subtitle" style="margin-top: 20px;">Generate, save, and manage your Stable Diffusion Flux prompts</p>
     """, unsafe_allow_html=True)
     
-    # Dashboard cards with instructions
-    cards = [
-        {
-            "title": "Generate Prompt",
-            "instructions": [
-                "Pick a model target (Flux or other).",
-                "Describe subject, style, camera",
-                "Add lighting, composition, context.",
-                "Click Generate to get a prompt.",
-                "Copy or Save to Repository."
-            ],
-            "page": "Generate Prompt"
-        },
-        {
-            "title": "Image Analysis",
-            "instructions": [
-                "Upload an image or paste a URL.",
-                "The tool generates a description of the image.",
-                "Convert findings into a ready-to-use prompt.",
-                "Save as a new prompt or append to an existing one."
-            ],
-            "page": "Image Analysis"
-        },
-        {
-            "title": "Prompt Repository",
-            "instructions": [
-                "Browse, search, and filter by tags, model, or date.",
-                "Open a prompt to preview, copy, or quick-edit.",
-                "Duplicate, version, or favorite for fast access."
-            ],
-            "page": "Prompt Repository"
-        },
-        {
-            "title": "Manage Prompts",
-            "instructions": [
-                "Bulk edit titles, tags, and metadata.",
-                "Move prompts into collections.",
-                "Import/Export prompts as JSON or CSV.",
-                "Archive or delete with undo."
-            ],
-            "page": "Manage Prompts"
-        },
-        {
-            "title": "Generate Images",
-            "instructions": [
-                "Choose a backend and model (Flux, SD, etc.).",
-                "Attach a prompt from the Repository or paste one.",
-                "Run."
-            ],
-            "page": "Generate Images"
-        },
-        {
-            "title": "Image Editing",
-            "instructions": [
-                "Upload an image to edit.",
-                "Enter a prompt describing the changes.",
-                "Adjust strength to control how much to change.",
-                "Generate and download the edited image."
-            ],
-            "page": "Image Editing"
-        },
-    ]
-    
     # Create grid using columns
     row1_col1, row1_col2, row1_col3 = st.columns(3)
     row2_col1, row2_col2, row2_col3 = st.columns(3)
     
-    cols_list = [
-        (row1_col1, cards[0]),
-        (row1_col2, cards[1]),
-        (row1_col3, cards[2]),
-        (row2_col1, cards[3]),
-        (row2_col2, cards[4]),
-        (row2_col3, cards[5]),
-    ]
+    cols_list = zip(
+        (row1_col1, row1_col2, row1_col3, row2_col1, row2_col2, row2_col3),
+        _DASHBOARD_CARDS,
+    )
     
-    for col, card_data in cols_list:
+    for col, card in cols_list:
         with col:
-            instructions_html = "".join([f'<li>{inst}</li>' for inst in card_data["instructions"]])
-            # Wrap card in a clickable container
-            card_container_key = f"card_container_{card_data['page']}"
-            button_key = f"dashboard_{card_data['page']}"
+            button_key = f"dashboard_{card.page}"
             
             # Create clickable card header button
-            if st.button(card_data['title'], key=button_key, use_container_width=True):
-                st.session_state.current_page = card_data["page"]
-                st.rerun()
+            if st.button(card.title, key=button_key, use_container_width=True):
+                st.switch_page(_PAGES[card.page])
             
-            # Display instructions below button (visually part of the card, also clickable)
-            st.markdown(f"""
-                <div class="dashboard-card-instructions" onclick="triggerDashboardNav('{card_data['page']}');" style="cursor: pointer;">
-                    <ul style="list-style: none; padding-left: 0; margin-top: 0;">
-                        {instructions_html}
-                    </ul>
-                </div>
-            """, unsafe_allow_html=True)
+            # Display instructions below button; st.html skips the markdown pipeline
+            st.html(_DASHBOARD_INSTRUCTIONS_HTML[card.page])
+
+def settings_page():
+    """Settings page placeholder"""
+    st.header("Settings")
+    st.info("Settings page coming soon.")
 
 def main():
-    # Load CSS styles
+    # Session defaults
+    init_state()
+    
+    # Route with the built-in multipage API; the sidebar renders its own navigation
+    page = st.navigation(list(_PAGES.values()), position="hidden")
+    
+    # Follow a page switch queued by the sidebar navigation before rendering
+    # anything, so the run that only hands off to the new page stays cheap
+    nav_target = st.session_state.pop('nav_target', None)
+    if nav_target in _PAGES and nav_target != page.title:
+        st.switch_page(_PAGES[nav_target])
+    
+    # Load CSS styles and render the top bar
     load_css()
     
-    # Render top bar
-    render_top_bar()
+    # Mirror the active page for code that still reads it
+    st.session_state.current_page = page.title
     
     # Render sidebar navigation
     render_sidebar()
@@ -973,28 +834,22 @@ def main():
     if not initialize_components():
         return
     
-    # Render current page based on selection
-    current_page = st.session_state.get('current_page', 'Dashboard')
-    
-    if current_page == 'Dashboard':
-        dashboard_page()
-    elif current_page == 'Generate Prompt':
-        generate_prompt_tab()
-    elif current_page == 'Image Analysis':
-        image_analysis_tab()
-    elif current_page == 'Prompt Repository':
-        prompt_repository_tab()
-    elif current_page == 'Manage Prompts':
-        manage_prompts_tab()
-    elif current_page == 'Generate Images':
-        generate_images_tab()
-    elif current_page == 'Image Editing':
-        image_editing_tab()
-    elif current_page == 'Settings':
-        st.header("Settings")
-        st.info("Settings page coming soon.")
-    elif current_page == 'Image Vault':
-        image_vault_tab()
+    # Only the selected page function runs
+    page.run()
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def _options_preview_markdown(_options_parser: PromptOptionsParser, labels: dict, prompts_version: float) -> str:
+    """Markdown for the options preview, built once per prompts-folder version"""
+    lines = ["**Available options for each parameter:**"]
+    for param, options in _options_parser.get_all_options().items():
+        if options:
+            lines.append(f"**{labels.get(param, param.title())}** ({len(options)} options):")
+            # Show first 10 options as preview
+            lines.append(f"*{', '.join(options[:10])}*")
+            if len(options) > 10:
+                lines.append(f"*... and {len(options) - 10} more options*")
+            lines.append("---")
+    return "\n\n".join(lines)
 
 def generate_prompt_tab():
     """Tab for generating new prompts"""
@@ -1004,20 +859,23 @@ def generate_prompt_tab():
     """, unsafe_allow_html=True)
     
     # Show notification if a prompt was loaded
-    if st.session_state.get('prompt_loaded', False):
-        loaded_id = st.session_state.get('loaded_prompt_id', '')
+    if st.session_state.prompt_loaded:
+        loaded_id = st.session_state.loaded_prompt_id
         st.success(f"✅ Prompt {loaded_id} loaded successfully! Form fields are populated below.")
         # Clear the flag after showing
         st.session_state['prompt_loaded'] = False
     
-    generator = st.session_state.prompt_generator
+    generator = _get_openai_service(_shared_prompt_generator)
+    if generator is None:
+        return
     data_manager = st.session_state.data_manager
     options_parser = st.session_state.options_parser
     
     # Get parameter info
-    parameters = generator.get_parameter_order()
-    labels = generator.get_parameter_labels()
-    tooltips = generator.get_tooltips()
+    param_meta = _param_meta()
+    parameters = param_meta['order']
+    labels = param_meta['labels']
+    tooltips = param_meta['tooltips']
     
     # Show available options info - styled as link
     st.markdown("""
@@ -1030,17 +888,8 @@ def generate_prompt_tab():
     """, unsafe_allow_html=True)
     
     with st.expander("📋 Available Options Preview", expanded=False):
-        st.markdown("**Available options for each parameter:**")
-        all_options = options_parser.get_all_options()
-        for param, options in all_options.items():
-            if options:
-                st.markdown(f"**{labels.get(param, param.title())}** ({len(options)} options):")
-                # Show first 10 options as preview
-                preview_options = options[:10]
-                st.markdown(f"*{', '.join(preview_options)}*")
-                if len(options) > 10:
-                    st.markdown(f"*... and {len(options) - 10} more options*")
-                st.markdown("---")
+        # One element instead of several per parameter; the body is sent even when collapsed
+        st.markdown(_options_preview_markdown(options_parser, labels, _prompts_version()))
     
     # Create input fields
     with st.form("prompt_form"):
@@ -1081,24 +930,8 @@ def generate_prompt_tab():
             generate_btn = st.form_submit_button("Generate Prompt", type="primary", use_container_width=True)
         with col2:
             save_btn = st.form_submit_button("Save Prompt", use_container_width=True)
-            st.markdown("""
-                <style>
-                    div[data-testid="column"]:nth-child(2) button {
-                        background: #1E1E2E !important;
-                        color: #FFFFFF !important;
-                    }
-                </style>
-            """, unsafe_allow_html=True)
         with col3:
             clear_btn = st.form_submit_button("Clear All", use_container_width=True)
-            st.markdown("""
-                <style>
-                    div[data-testid="column"]:nth-child(3) button {
-                        background: #1E1E2E !important;
-                        color: #FFFFFF !important;
-                    }
-                </style>
-            """, unsafe_allow_html=True)
     
     # Handle form actions
     if generate_btn:
@@ -1114,17 +947,7 @@ def generate_prompt_tab():
             
             # Copy to clipboard button for generated prompt (Generate Prompt tab)
             if generated_prompt:
-                components.html(
-                    f"""
-                    <div>
-                      <button style=\"padding:8px 12px; margin-top:6px;\" onclick=\"navigator.clipboard.writeText(text_{id(generated_prompt)}).then(()=>{{{{this.innerText='Copied!'; setTimeout(()=>this.innerText='Copy Generated Prompt',1500)}}}});\">Copy Generated Prompt</button>
-                      <script>
-                        const text_{id(generated_prompt)} = {json.dumps(generated_prompt)};
-                      </script>
-                    </div>
-                    """,
-                    height=60,
-                )
+                _copy_button(text=generated_prompt, key="copy_generated_prompt")
             
             # Store in session state for saving
             st.session_state.current_prompt = generated_prompt
@@ -1143,7 +966,7 @@ def generate_prompt_tab():
                 # Save to CSV
                 prompt_id = data_manager.save_prompt(save_data)
                 st.success(f"Prompt saved with ID: {prompt_id}")
-                logger.info(f"Prompt saved via web interface with ID: {prompt_id}")
+                logger.info("Prompt saved via web interface with ID: %s", prompt_id)
                 
             except Exception as e:
                 st.error(f"Error saving prompt: {str(e)}")
@@ -1151,25 +974,73 @@ def generate_prompt_tab():
             st.warning("Please generate a prompt first before saving")
     
     if clear_btn:
-        # Clear session state
-        for param in parameters:
-            if f"param_{param}" in st.session_state:
-                del st.session_state[f"param_{param}"]
-        # Also clear generated prompt artifacts
-        for key in ["current_prompt", "current_params"]:
-            if key in st.session_state:
-                del st.session_state[key]
+        # Clear parameter values and generated prompt artifacts in one pass
+        for key in [f"param_{param}" for param in parameters] + ["current_prompt", "current_params"]:
+            st.session_state.pop(key, None)
         st.rerun()
 
-def manage_prompts_tab():
-    """Tab for managing saved prompts"""
-    st.markdown("""
-        <h1 class="page-header">Manage Prompts</h1>
-        <p class="page-subtitle">Edit, delete, and organize your saved prompts</p>
-    """, unsafe_allow_html=True)
-    
-    data_manager = st.session_state.data_manager
-    
+# Rows shown per page in the prompts table
+_PROMPTS_PAGE_SIZE = 50
+
+# Display columns for the prompts table: (field, column title, max length)
+_PROMPT_DISPLAY_COLUMNS = (
+    ('context', 'Context', 100),
+    ('generated_prompt', 'Generated Prompt', 150),
+)
+_PROMPT_EXTENDED_COLUMNS = (
+    ('art_style', 'Image Style', 50),
+    ('environment', 'Environment', 50),
+    ('camera_angle', 'Camera Angle', 30),
+    ('lighting', 'Lighting', 30),
+)
+
+def _truncate_column(values: pd.Series, max_length: int) -> pd.Series:
+    """Cut strings to max_length, marking truncated ones with '...'"""
+    values = values.fillna('').astype(str)
+    head = values.str.slice(0, max_length)
+    return head.where(values.str.len() <= max_length, head + '...')
+
+def _build_prompts_display(prompts, show_extended: bool) -> pd.DataFrame:
+    """Build the prompts table with vectorized string truncation"""
+    columns = _PROMPT_DISPLAY_COLUMNS + (_PROMPT_EXTENDED_COLUMNS if show_extended else ())
+    source = pd.DataFrame(prompts).reindex(columns=['id', 'timestamp'] + [field for field, _, _ in columns])
+    
+    df = pd.DataFrame({'ID': source['id'], 'Timestamp': source['timestamp']})
+    for field, title, max_length in columns:
+        df[title] = _truncate_column(source[field], max_length)
+    return df
+
+def _prompts_csv_version(data_manager) -> tuple:
+    """Identify the current contents of the prompts CSV (path, mtime, size)"""
+    try:
+        stat = os.stat(data_manager.csv_file)
+        return (data_manager.csv_file, stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return (data_manager.csv_file, 0, 0)
+
+# Sort options for the prompts table: label -> (sort key, descending)
+_PROMPT_SORTS = {
+    "Timestamp (Newest)": (lambda p: p.get('timestamp', ''), True),
+    "Timestamp (Oldest)": (lambda p: p.get('timestamp', ''), False),
+    "ID": (lambda p: p.get('id', ''), False),
+    "Context": (lambda p: p.get('context', '').lower(), False),
+}
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _load_prompts(_data_manager, csv_version: tuple, search_term: str = "", field=None, sort_by: str = ""):
+    """Load or search prompts, sorted; any write to the CSV changes csv_version and misses the cache"""
+    if search_term:
+        prompts = _data_manager.search_prompts(search_term, field)
+    else:
+        prompts = _data_manager.load_all_prompts()
+    if sort_by in _PROMPT_SORTS:
+        key, descending = _PROMPT_SORTS[sort_by]
+        prompts.sort(key=key, reverse=descending)
+    return prompts
+
+@st.fragment
+def _manage_prompts_view(data_manager):
+    """Search, table and actions; their widgets rerun only this fragment, not the whole app"""
     try:
         # Search functionality
         st.subheader("🔍 Search & Filter")
@@ -1182,7 +1053,7 @@ def manage_prompts_tab():
             search_field = st.selectbox("Search in", ["All fields", "Context", "Image Style", "Environment", "Generated Prompt"])
         
         with col3:
-            sort_by = st.selectbox("Sort by", ["Timestamp (Newest)", "Timestamp (Oldest)", "ID", "Context"])
+            sort_by = st.selectbox("Sort by", list(_PROMPT_SORTS))
         
         # Load and filter prompts
         if search_term:
@@ -1194,20 +1065,9 @@ def manage_prompts_tab():
                 "Generated Prompt": "generated_prompt"
             }
             field = field_map.get(search_field)
-            prompts = data_manager.search_prompts(search_term, field)
+            prompts = _load_prompts(data_manager, _prompts_csv_version(data_manager), search_term, field, sort_by)
         else:
-            prompts = data_manager.load_all_prompts()
-        
-        # Sort prompts
-        if prompts:
-            if sort_by == "Timestamp (Newest)":
-                prompts.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-            elif sort_by == "Timestamp (Oldest)":
-                prompts.sort(key=lambda x: x.get('timestamp', ''))
-            elif sort_by == "ID":
-                prompts.sort(key=lambda x: x.get('id', ''))
-            elif sort_by == "Context":
-                prompts.sort(key=lambda x: x.get('context', '').lower())
+            prompts = _load_prompts(data_manager, _prompts_csv_version(data_manager), sort_by=sort_by)
         
         if not prompts:
             if search_term:
@@ -1220,32 +1080,29 @@ def manage_prompts_tab():
         st.subheader("📋 Display Options")
         show_extended = st.checkbox("Show extended columns (Image Style, Environment, etc.)", value=False)
         
-        # Create DataFrame for display
-        df_display = []
-        for prompt in prompts:
-            row = {
-                'ID': prompt['id'],
-                'Timestamp': prompt['timestamp'],
-                'Context': prompt.get('context', '')[:100] + ('...' if len(prompt.get('context', '')) > 100 else ''),
-                'Generated Prompt': prompt.get('generated_prompt', '')[:150] + ('...' if len(prompt.get('generated_prompt', '')) > 150 else '')
-            }
-            if show_extended:
-                row['Image Style'] = prompt.get('art_style', '')[:50] + ('...' if len(prompt.get('art_style', '')) > 50 else '')
-                row['Environment'] = prompt.get('environment', '')[:50] + ('...' if len(prompt.get('environment', '')) > 50 else '')
-                row['Camera Angle'] = prompt.get('camera_angle', '')[:30] + ('...' if len(prompt.get('camera_angle', '')) > 30 else '')
-                row['Lighting'] = prompt.get('lighting', '')[:30] + ('...' if len(prompt.get('lighting', '')) > 30 else '')
-            df_display.append(row)
+        # Only the current page of prompts is materialized in the table
+        total_pages = max(1, -(-len(prompts) // _PROMPTS_PAGE_SIZE))
+        page = 1
+        if total_pages > 1:
+            page = st.number_input("Page", min_value=1, max_value=total_pages, value=1, step=1)
+        page_start = (page - 1) * _PROMPTS_PAGE_SIZE
+        page_prompts = prompts[page_start:page_start + _PROMPTS_PAGE_SIZE]
         
-        df = pd.DataFrame(df_display)
+        # Create DataFrame for display
+        df = _build_prompts_display(page_prompts, show_extended)
         
         # Display prompts table
         st.subheader(f"Saved Prompts ({len(prompts)} total)")
+        if total_pages > 1:
+            st.caption(f"Page {page} of {total_pages} - showing {page_start + 1}-{page_start + len(page_prompts)}")
         
-        # Add selection functionality
-        selected_indices = st.multiselect(
+        # Select by prompt id, so a selection never carries over to other rows on another page
+        page_by_id = {p['id']: p for p in page_prompts}
+        option_labels = dict(zip(df['ID'], df['ID'].astype(str) + ' - ' + df['Timestamp'].astype(str)))
+        selected_ids = st.multiselect(
             "Select prompts to manage:",
-            options=range(len(df)),
-            format_func=lambda x: f"{df.iloc[x]['ID']} - {df.iloc[x]['Timestamp']}"
+            options=list(page_by_id),
+            format_func=option_labels.__getitem__
         )
         
         st.dataframe(df, use_container_width=True)
@@ -1255,31 +1112,25 @@ def manage_prompts_tab():
         
         with col1:
             if st.button("📥 Load Selected", help="Load the first selected prompt into the generator"):
-                if selected_indices:
-                    idx = selected_indices[0]  # Load first selected
-                    prompt_id = df.iloc[idx]['ID']
-                    load_prompt(prompt_id)
+                if selected_ids:
+                    load_prompt(selected_ids[0])  # Load first selected
                 else:
                     st.warning("Please select a prompt to load")
         
         with col2:
-            # Initialize delete confirmation state
-            if 'delete_confirmation' not in st.session_state:
-                st.session_state.delete_confirmation = None
-            
             if st.button("🗑️ Delete Selected", help="Delete selected prompts (with confirmation)"):
-                if selected_indices:
-                    st.session_state.delete_confirmation = selected_indices.copy()
+                if selected_ids:
+                    st.session_state.delete_confirmation = selected_ids.copy()
                     st.rerun()
                 else:
                     st.warning("Please select prompts to delete")
             
             # Show delete confirmation if pending
             if st.session_state.delete_confirmation is not None:
-                # Validate that confirmation indices are still valid
-                valid_indices = [idx for idx in st.session_state.delete_confirmation if 0 <= idx < len(df)]
-                if valid_indices:
-                    delete_prompts(valid_indices, df, prompts)
+                # Validate that the confirmed prompts are still on this page
+                valid_ids = [pid for pid in st.session_state.delete_confirmation if pid in page_by_id]
+                if valid_ids:
+                    delete_prompts([page_by_id[pid] for pid in valid_ids])
                 else:
                     # Clear invalid confirmation state
                     st.session_state.delete_confirmation = None
@@ -1287,9 +1138,8 @@ def manage_prompts_tab():
         
         with col3:
             if st.button("📤 Export Selected", help="Export selected prompts as CSV"):
-                if selected_indices:
-                    selected_prompts = [prompts[i] for i in selected_indices]
-                    export_csv(selected_prompts)
+                if selected_ids:
+                    export_csv([page_by_id[pid] for pid in selected_ids])
                 else:
                     st.warning("Please select prompts to export")
         
@@ -1314,18 +1164,9 @@ def manage_prompts_tab():
             if uploaded_csv is not None:
                 if st.button("Import Prompts"):
                     try:
-                        # Save uploaded file temporarily
-                        import tempfile
-                        with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as tmp_file:
-                            tmp_file.write(uploaded_csv.getvalue())
-                            tmp_file_path = tmp_file.name
-                        
-                        # Import prompts
-                        imported_count = data_manager.import_from_csv(tmp_file_path)
-                        
-                        # Clean up temp file
-                        import os
-                        os.unlink(tmp_file_path)
+                        # Import straight from the uploaded buffer, no temp file
+                        uploaded_csv.seek(0)
+                        imported_count = data_manager.import_from_csv(uploaded_csv)
                         
                         st.success(f"✅ Imported {imported_count} prompts successfully!")
                         st.rerun()
@@ -1334,12 +1175,21 @@ def manage_prompts_tab():
                         st.error(f"Import failed: {str(e)}")
         
         # Show detailed view if one prompt is selected
-        if len(selected_indices) == 1:
-            show_prompt_details(prompts[selected_indices[0]], data_manager)
+        if len(selected_ids) == 1:
+            show_prompt_details(page_by_id[selected_ids[0]], data_manager)
             
     except Exception as e:
         st.error(f"Error loading prompts: {str(e)}")
 
+def manage_prompts_tab():
+    """Tab for managing saved prompts"""
+    st.markdown("""
+        <h1 class="page-header">Manage Prompts</h1>
+        <p class="page-subtitle">Edit, delete, and organize your saved prompts</p>
+    """, unsafe_allow_html=True)
+    
+    _manage_prompts_view(st.session_state.data_manager)
+
 def load_prompt(prompt_id):
     """Load a prompt into the generator form"""
     try:
@@ -1348,7 +1198,7 @@ def load_prompt(prompt_id):
         
         if prompt_data:
             # Store in session state to populate form
-            for param in st.session_state.prompt_generator.get_parameter_order():
+            for param in _param_meta()['order']:
                 value = prompt_data.get(param, '')
                 st.session_state[f"param_{param}"] = value
             
@@ -1365,18 +1215,18 @@ def load_prompt(prompt_id):
     except Exception as e:
         st.error(f"Error loading prompt: {str(e)}")
 
-def delete_prompts(selected_indices, df, prompts):
+def delete_prompts(prompts):
     """Delete selected prompts with confirmation"""
     try:
         # Show confirmation
         st.markdown("---")
-        if len(selected_indices) == 1:
-            prompt_id = df.iloc[selected_indices[0]]['ID']
-            context_preview = prompts[selected_indices[0]].get('context', '')[:50]
+        if len(prompts) == 1:
+            prompt_id = prompts[0]['id']
+            context_preview = prompts[0].get('context', '')[:50]
             st.warning(f"⚠️ **Delete Confirmation** - Are you sure you want to delete prompt {prompt_id}?")
             st.info(f"**Context:** {context_preview}...")
         else:
-            st.warning(f"⚠️ **Delete Confirmation** - Are you sure you want to delete {len(selected_indices)} prompts?")
+            st.warning(f"⚠️ **Delete Confirmation** - Are you sure you want to delete {len(prompts)} prompts?")
             st.info("This action cannot be undone.")
         
         # Confirmation buttons
@@ -1384,12 +1234,8 @@ def delete_prompts(selected_indices, df, prompts):
         with col1:
             if st.button("✅ Confirm Delete", type="primary", key="confirm_delete_btn"):
                 data_manager = st.session_state.data_manager
-                deleted_count = 0
-                
-                for idx in selected_indices:
-                    prompt_id = df.iloc[idx]['ID']
-                    if data_manager.delete_prompt(prompt_id):
-                        deleted_count += 1
+                # One rewrite of the CSV for the whole selection
+                deleted_count = data_manager.delete_many([prompt['id'] for prompt in prompts])
                 
                 # Clear confirmation state
                 st.session_state.delete_confirmation = None
@@ -1408,15 +1254,17 @@ def delete_prompts(selected_indices, df, prompts):
         # Clear confirmation state on error
         st.session_state.delete_confirmation = None
 
+@st.cache_data(show_spinner=False, max_entries=4)
+def _prompts_csv_bytes(prompts) -> bytes:
+    """Serialize prompts to CSV once per distinct selection"""
+    return pd.DataFrame(prompts).to_csv(index=False).encode('utf-8')
+
 def export_csv(prompts):
     """Export prompts as CSV download"""
     try:
-        df = pd.DataFrame(prompts)
-        csv = df.to_csv(index=False)
-        
         st.download_button(
             label="Download CSV",
-            data=csv,
+            data=_prompts_csv_bytes(prompts),
             file_name=f"flux_prompts_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
             mime="text/csv"
         )
@@ -1424,133 +1272,235 @@ def export_csv(prompts):
     except Exception as e:
         st.error(f"Error exporting CSV: {str(e)}")
 
+# Fields listed in the read-only prompt details table
+_PROMPT_DETAIL_FIELDS = (
+    ('context', 'Context'),
+    ('art_style', 'Image Style'),
+    ('camera_angle', 'Camera Angle'),
+    ('environment', 'Environment'),
+    ('lighting', 'Lighting'),
+    ('focus', 'Focus'),
+    ('color_palette', 'Color Palette'),
+    ('composition', 'Composition'),
+    ('modifiers', 'Modifiers'),
+)
+
+def _set_edit_mode(edit_key: str, enabled: bool):
+    """Button callback; runs before the fragment rerun, so no extra st.rerun() is needed"""
+    st.session_state[edit_key] = enabled
+
+@st.fragment
 def show_prompt_details(prompt, data_manager):
-    """Show detailed view of a selected prompt with edit functionality"""
+    """Show detailed view of a selected prompt with edit functionality; edit/cancel rerun only this panel"""
     st.subheader("📝 Prompt Details")
     
-    # Initialize edit mode in session state if not exists
-    if f"edit_mode_{prompt['id']}" not in st.session_state:
-        st.session_state[f"edit_mode_{prompt['id']}"] = False
+    pid = prompt['id']
+    edit_key = f"edit_mode_{pid}"
     
-    edit_mode = st.session_state[f"edit_mode_{prompt['id']}"]
+    # Initialize edit mode in session state if not exists
+    edit_mode = st.session_state.setdefault(edit_key, False)
     
     # Edit mode toggle
     col1, col2 = st.columns([3, 1])
     with col1:
-        st.markdown(f"**Prompt ID:** {prompt['id']} | **Created:** {prompt['timestamp']}")
+        st.markdown(f"**Prompt ID:** {pid} | **Created:** {prompt['timestamp']}")
     with col2:
-        if st.button("✏️ Edit" if not edit_mode else "👁️ View Only", key=f"toggle_edit_{prompt['id']}"):
-            st.session_state[f"edit_mode_{prompt['id']}"] = not edit_mode
-            st.rerun()
+        st.button("✏️ Edit" if not edit_mode else "👁️ View Only", key=f"toggle_edit_{pid}",
+                  on_click=_set_edit_mode, args=(edit_key, not edit_mode))
     
     with st.expander("View/Edit Full Details", expanded=True):
+        if not edit_mode:
+            # Read-only view: one table instead of a disabled widget per field
+            details_df = pd.DataFrame(
+                [{'Field': 'ID', 'Value': pid}, {'Field': 'Timestamp', 'Value': prompt['timestamp']}]
+                + [{'Field': label, 'Value': prompt.get(field, '')} for field, label in _PROMPT_DETAIL_FIELDS]
+            )
+            st.dataframe(details_df, hide_index=True, use_container_width=True)
+            st.markdown("**Generated Prompt**")
+            st.code(prompt.get('generated_prompt', ''), language=None)
+            return
+        
         # Store edited values
         edited_data = {}
         
         col1, col2 = st.columns(2)
         
         with col1:
-            st.text_input("ID", value=prompt['id'], disabled=True, key=f"id_{prompt['id']}")
-            st.text_input("Timestamp", value=prompt['timestamp'], disabled=True, key=f"timestamp_{prompt['id']}")
-            
             edited_data['context'] = st.text_area(
                 "Context", 
                 value=prompt.get('context', ''), 
-                disabled=not edit_mode,
-                key=f"context_{prompt['id']}",
+                key=f"context_{pid}",
                 height=100
             )
             edited_data['art_style'] = st.text_input(
                 "Image Style", 
                 value=prompt.get('art_style', ''), 
-                disabled=not edit_mode,
-                key=f"art_style_{prompt['id']}"
+                key=f"art_style_{pid}"
             )
             edited_data['camera_angle'] = st.text_input(
                 "Camera Angle", 
                 value=prompt.get('camera_angle', ''), 
-                disabled=not edit_mode,
-                key=f"camera_angle_{prompt['id']}"
+                key=f"camera_angle_{pid}"
             )
         
         with col2:
             edited_data['environment'] = st.text_input(
                 "Environment", 
                 value=prompt.get('environment', ''), 
-                disabled=not edit_mode,
-                key=f"environment_{prompt['id']}"
+                key=f"environment_{pid}"
             )
             edited_data['lighting'] = st.text_input(
                 "Lighting", 
                 value=prompt.get('lighting', ''), 
-                disabled=not edit_mode,
-                key=f"lighting_{prompt['id']}"
+                key=f"lighting_{pid}"
             )
             edited_data['focus'] = st.text_input(
                 "Focus", 
                 value=prompt.get('focus', ''), 
-                disabled=not edit_mode,
-                key=f"focus_{prompt['id']}"
+                key=f"focus_{pid}"
             )
             edited_data['color_palette'] = st.text_input(
                 "Color Palette", 
                 value=prompt.get('color_palette', ''), 
-                disabled=not edit_mode,
-                key=f"color_palette_{prompt['id']}"
+                key=f"color_palette_{pid}"
             )
             edited_data['composition'] = st.text_input(
                 "Composition", 
                 value=prompt.get('composition', ''), 
-                disabled=not edit_mode,
-                key=f"composition_{prompt['id']}"
+                key=f"composition_{pid}"
             )
         
         edited_data['modifiers'] = st.text_area(
             "Modifiers", 
             value=prompt.get('modifiers', ''), 
-            disabled=not edit_mode,
-            key=f"modifiers_{prompt['id']}",
+            key=f"modifiers_{pid}",
             height=80
         )
         edited_data['generated_prompt'] = st.text_area(
             "Generated Prompt", 
             value=prompt.get('generated_prompt', ''), 
-            disabled=not edit_mode,
-            key=f"generated_prompt_{prompt['id']}",
+            key=f"generated_prompt_{pid}",
             height=150
         )
         
-        # Save button (only shown in edit mode)
-        if edit_mode:
-            col1, col2, col3 = st.columns([1, 1, 2])
-            with col1:
-                if st.button("💾 Save Changes", type="primary", key=f"save_{prompt['id']}"):
-                    try:
-                        # Update the prompt
-                        if data_manager.update_prompt(prompt['id'], edited_data):
-                            st.success("✅ Prompt updated successfully!")
-                            st.session_state[f"edit_mode_{prompt['id']}"] = False
-                            st.rerun()
-                        else:
-                            st.error("Failed to update prompt")
-                    except Exception as e:
-                        st.error(f"Error updating prompt: {str(e)}")
-            
-            with col2:
-                if st.button("❌ Cancel", key=f"cancel_{prompt['id']}"):
-                    st.session_state[f"edit_mode_{prompt['id']}"] = False
-                    st.rerun()
+        # Save button
+        col1, col2, col3 = st.columns([1, 1, 2])
+        with col1:
+            if st.button("💾 Save Changes", type="primary", key=f"save_{pid}"):
+                try:
+                    # Update the prompt
+                    if data_manager.update_prompt(pid, edited_data):
+                        st.success("✅ Prompt updated successfully!")
+                        st.session_state[edit_key] = False
+                        # The table above shows the old values; refresh the whole page
+                        st.rerun(scope="app")
+                    else:
+                        st.error("Failed to update prompt")
+                except Exception as e:
+                    st.error(f"Error updating prompt: {str(e)}")
+        
+        with col2:
+            st.button("❌ Cancel", key=f"cancel_{pid}", on_click=_set_edit_mode, args=(edit_key, False))
 
-def image_analysis_tab():
-    """Tab for analyzing images and generating prompts"""
-    st.markdown("""
-        <h1 class="page-header">Image Analysis & Prompt Generation</h1>
-        <p class="page-subtitle">Upload an image to analyze and generate a Flux prompt from it</p>
-    """, unsafe_allow_html=True)
-    
-    analyzer = st.session_state.image_analyzer
-    data_manager = st.session_state.data_manager
+# Longest side of the Image Analysis preview sent to the browser
+_PREVIEW_MAX_SIZE = 1024
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _preview_bytes(file_id: str, _uploaded_file) -> bytes:
+    """Downscaled WebP preview of an upload, built once per file_id"""
+    _uploaded_file.seek(0)
+    try:
+        with Image.open(_uploaded_file) as img:
+            # Bake in the EXIF rotation, the WebP copy carries no EXIF
+            preview = ImageOps.exif_transpose(img)
+            preview.thumbnail((_PREVIEW_MAX_SIZE, _PREVIEW_MAX_SIZE))
+            if preview.mode not in ("RGB", "RGBA"):
+                preview = preview.convert("RGBA" if "A" in preview.getbands() or "transparency" in preview.info else "RGB")
+            buffer = io.BytesIO()
+            preview.save(buffer, format="WEBP", quality=85)
+            return buffer.getvalue()
+    finally:
+        _uploaded_file.seek(0)
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _decode_image(raw: bytes) -> Image.Image:
+    """Decode uploaded image bytes once per upload; treat the result as read-only"""
+    image = Image.open(io.BytesIO(raw))
+    image.load()
+    return image
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def _analyze_image(raw: bytes, analysis_type: str) -> dict:
+    """Analyze an uploaded image, cached across reruns and sessions"""
+    return _shared_image_analyzer().analyze_image(_decode_image(raw), analysis_type)
+
+@lru_cache(maxsize=16)
+def _analysis_type_list_html(analysis_types: tuple, selected: str) -> str:
+    """Analysis type list markup; one variant per selected type, built once"""
+    items = "".join(
+        f'<li class="analysis-type-item {"selected" if atype == selected else ""}">'
+        f'<strong>{atype.title()}</strong> - {desc}</li>'
+        for atype, desc in analysis_types
+    )
+    return f'<ul class="analysis-type-list">{items}</ul>'
+
+# Prompt fields filled from a structured (detailed) analysis result
+_ANALYSIS_PROMPT_FIELDS = (
+    'art_style', 'camera_angle', 'environment', 'lighting',
+    'focus', 'color_palette', 'composition', 'modifiers',
+)
+
+# Read-only fields of a structured analysis, per column (Modifiers follows in the second)
+_ANALYSIS_RESULT_COLUMNS = (
+    (('subject', 'Subject'), ('art_style', 'Image Style'), ('camera_angle', 'Camera Angle'),
+     ('environment', 'Environment'), ('lighting', 'Lighting')),
+    (('focus', 'Focus'), ('color_palette', 'Color Palette'), ('composition', 'Composition')),
+)
+
+def _save_analysis_as_prompt(result: dict, structured: bool) -> None:
+    """Save an analysis result as a new prompt and report the outcome"""
+    if structured:
+        save_data = {field: result.get(field, '') for field in _ANALYSIS_PROMPT_FIELDS}
+        save_data['context'] = result.get('subject', '')
+    else:
+        # Text analyses only carry a description and a suggested prompt
+        save_data = dict.fromkeys(_ANALYSIS_PROMPT_FIELDS, '')
+        save_data['context'] = 'Image Analysis'
+        save_data['modifiers'] = result.get('description', '')
+    save_data['generated_prompt'] = result.get('suggested_prompt', '')
     
+    try:
+        # Save to CSV
+        prompt_id = st.session_state.data_manager.save_prompt(save_data)
+        st.success(f"✅ Analysis saved as prompt with ID: {prompt_id}")
+        logger.info("Image analysis saved as prompt with ID: %s", prompt_id)
+    except Exception as e:
+        st.error(f"Error saving analysis: {str(e)}")
+
+# Static usage notes under the Image Analysis controls
+_ANALYSIS_INSTRUCTIONS_HTML = '''
+    <div class="instructions-section">
+        <h3 class="instructions-title">How to Use Image Analysis</h3>
+        <ul class="instructions-list">
+            <li><strong>Upload an Image:</strong> Choose any image file (PNG, JPG, etc.)</li>
+            <li><strong>Select Analysis Type:</strong>
+                <ul style="margin-left: 20px; margin-top: 10px;">
+                    <li><strong>Detailed:</strong> Comprehensive analysis - structured data</li>
+                    <li><strong>Artistic:</strong> Focus on artistic style and visual qualities</li>
+                    <li><strong>Technical:</strong> Aspects like composition and lighting</li>
+                    <li><strong>Simple:</strong> Basic description of main elements</li>
+                </ul>
+            </li>
+            <li><strong>Analyze:</strong> Click the analyze button to process the image</li>
+            <li><strong>Review Results:</strong> Check the generated description and prompt</li>
+            <li><strong>Save:</strong> Save the analysis as a new prompt for future use</li>
+        </ul>
+    </div>
+'''
+
+@st.fragment
+def _image_analysis_view(analyzer):
+    """Upload, analysis controls and results; their widgets rerun only this fragment"""
     # Layout: Left side for controls, right side for preview
     col_left, col_right = st.columns([1.2, 1])
     
@@ -1584,85 +1534,63 @@ def image_analysis_tab():
             label_visibility="collapsed"
         )
         
-        # Analysis type list display
-        st.markdown('<ul class="analysis-type-list">', unsafe_allow_html=True)
-        for atype, desc in analysis_types.items():
-            is_selected = "selected" if analysis_type == atype else ""
-            st.markdown(f'<li class="analysis-type-item {is_selected}"><strong>{atype.title()}</strong> - {desc}</li>', unsafe_allow_html=True)
-        st.markdown('</ul>', unsafe_allow_html=True)
+        # Analysis type list display, emitted as a single element
+        st.html(_analysis_type_list_html(tuple(analysis_types.items()), analysis_type))
         
         # Analyze button - Match sidebar active color
-        analyze_clicked = st.button("🔍 Analyze image", type="primary", use_container_width=True)
-        st.markdown("""
-            <style>
-                div[data-testid="column"]:nth-child(1) button[kind="primary"] {
-                    background: rgb(17, 130, 221) !important;
-                    color: #FFFFFF !important;
-                    font-weight: 700 !important;
-                }
-                div[data-testid="column"]:nth-child(1) button[kind="primary"]:hover {
-                    background: rgb(25, 140, 230) !important;
-                }
-            </style>
-        """, unsafe_allow_html=True)
+        analyze_clicked = st.button("🔍 Analyze image", type="primary", key="analyze_image_btn", use_container_width=True)
         
-        # Instructions section
-        st.markdown("""
-            <div class="instructions-section">
-                <h3 class="instructions-title">How to Use Image Analysis</h3>
-                <ul class="instructions-list">
-                    <li><strong>Upload an Image:</strong> Choose any image file (PNG, JPG, etc.)</li>
-                    <li><strong>Select Analysis Type:</strong>
-                        <ul style="margin-left: 20px; margin-top: 10px;">
-                            <li><strong>Detailed:</strong> Comprehensive analysis - structured data</li>
-                            <li><strong>Artistic:</strong> Focus on artistic style and visual qualities</li>
-                            <li><strong>Technical:</strong> Aspects like composition and lighting</li>
-                            <li><strong>Simple:</strong> Basic description of main elements</li>
-                        </ul>
-                    </li>
-                    <li><strong>Analyze:</strong> Click the analyze button to process the image</li>
-                    <li><strong>Review Results:</strong> Check the generated description and prompt</li>
-                    <li><strong>Save:</strong> Save the analysis as a new prompt for future use</li>
-                </ul>
-            </div>
-        """, unsafe_allow_html=True)
+        # Instructions section; st.html skips the markdown pipeline
+        st.html(_ANALYSIS_INSTRUCTIONS_HTML)
     
     with col_right:
         if uploaded_file is not None:
             # Display the uploaded image in preview
-            file_size = len(uploaded_file.getvalue()) / (1024 * 1024)  # MB
+            file_size = uploaded_file.size / (1024 * 1024)  # MB
+            # The file name is user-controlled; escape it before it goes into HTML
             st.markdown(f"""
                 <div class="image-preview-container">
-                    <div class="image-info">{uploaded_file.name} {file_size:.1f}MB</div>
+                    <div class="image-info">{html.escape(uploaded_file.name)} {file_size:.1f}MB</div>
+                </div>
             """, unsafe_allow_html=True)
             
-            st.image(uploaded_file, use_container_width=True)
+            # A cached, downscaled copy; the full upload is only decoded for analysis
+            try:
+                st.image(_preview_bytes(uploaded_file.file_id, uploaded_file), use_container_width=True)
+            except Exception:
+                st.image(uploaded_file, use_container_width=True)
             
-            # Get image dimensions if possible
+            # Get image dimensions if possible; PIL reads only the header here
             try:
-                from PIL import Image
-                import io
-                img = Image.open(io.BytesIO(uploaded_file.getvalue()))
-                width, height = img.size
+                uploaded_file.seek(0)
+                with Image.open(uploaded_file) as img:
+                    width, height = img.size
+                    # EXIF orientations 5-8 are displayed rotated by 90 degrees
+                    if img.getexif().get(0x0112) in (5, 6, 7, 8):
+                        width, height = height, width
                 st.markdown(f'<div class="image-dimensions">{width} x {height}</div>', unsafe_allow_html=True)
-            except:
+            except Exception:
                 pass
-            
-            st.markdown('</div>', unsafe_allow_html=True)
+            finally:
+                uploaded_file.seek(0)
     
     # Analysis processing
-    if uploaded_file is not None and analyze_clicked:
+    analysis_key = (uploaded_file.file_id, analysis_type) if uploaded_file is not None else None
+    if analyze_clicked and analysis_key is not None:
+        st.session_state.analysis_key = analysis_key
+    
+    # Keep showing the results on reruns from the result buttons (Save, Send);
+    # the cached analysis makes this free
+    if analysis_key is not None and st.session_state.analysis_key == analysis_key:
         with st.spinner("Analyzing image..."):
             try:
-                # Convert uploaded file to PIL Image
-                from PIL import Image
-                import io
-                image = Image.open(io.BytesIO(uploaded_file.getvalue()))
-                
-                # Perform analysis
-                analysis_result = analyzer.analyze_image(image, analysis_type)
+                # Perform analysis (cached per image and analysis type)
+                analysis_result = _analyze_image(uploaded_file.getvalue(), analysis_type)
                 
                 if "error" in analysis_result:
+                    # Don't keep failures around; the next click retries
+                    _analyze_image.clear(uploaded_file.getvalue(), analysis_type)
+                    st.session_state.analysis_key = None
                     st.error(analysis_result["error"])
                 else:
                     # Display results
@@ -1670,209 +1598,130 @@ def image_analysis_tab():
                     
                     # Show analysis results in left column
                     with col_left:
-                        if analysis_type == "detailed" and "subject" in analysis_result:
-
+                        structured = analysis_type == "detailed" and "subject" in analysis_result
+                        suggested_prompt = analysis_result.get("suggested_prompt", "")
+                        
+                        if structured:
                             # Structured analysis
                             st.subheader("📊 Analysis Results")
                             
-                            col1, col2 = st.columns(2)
-                            
-                            with col1:
-                                st.text_input("Subject", value=analysis_result.get("subject", ""), disabled=True)
-                                st.text_input("Image Style", value=analysis_result.get("art_style", ""), disabled=True)
-                                st.text_input("Camera Angle", value=analysis_result.get("camera_angle", ""), disabled=True)
-                                st.text_input("Environment", value=analysis_result.get("environment", ""), disabled=True)
-                                st.text_input("Lighting", value=analysis_result.get("lighting", ""), disabled=True)
-                            
-                            with col2:
-                                st.text_input("Focus", value=analysis_result.get("focus", ""), disabled=True)
-                                st.text_input("Color Palette", value=analysis_result.get("color_palette", ""), disabled=True)
-                                st.text_input("Composition", value=analysis_result.get("composition", ""), disabled=True)
-                                st.text_area("Modifiers", value=analysis_result.get("modifiers", ""), disabled=True)
-                            
-                            # Generated prompt
-                            suggested_prompt = analysis_result.get("suggested_prompt", "")
-                            st.text_area("Generated Prompt", value=suggested_prompt, height=150, disabled=True)
-                            
-                            # Send to Generate Prompt button
-                            subject_text = analysis_result.get("subject", "") or suggested_prompt
-                            if st.button("Send to Generate Prompt", key="send_to_generate_prompt_detailed"):
-                                st.session_state["param_context"] = subject_text
-                                st.success("Sent to Generate Prompt! Switch to the 'Generate Prompt' tab to continue.")
-                            
-                            # Copy to clipboard button for generated prompt
-                            if suggested_prompt:
-                                components.html(
-                                    f"""
-                                    <div>
-                                      <button style=\"padding:8px 12px; margin-top:6px;\" onclick=\"navigator.clipboard.writeText(text_{id(suggested_prompt)}).then(()=>{{{{this.innerText='Copied!'; setTimeout(()=>this.innerText='Copy Generated Prompt',1500)}}}});\">Copy Generated Prompt</button>
-                                      <script>
-                                        const text_{id(suggested_prompt)} = {json.dumps(suggested_prompt)};
-                                      </script>
-                                    </div>
-                                    """,
-                                    height=60,
-                                )
-                            
-                            # Store for saving
-                            st.session_state.analysis_result = analysis_result
-                            
-                            # Always show save button if analysis result exists
-                            if 'analysis_result' in st.session_state:
-                                save_clicked = st.button("💾 Save Analysis as Prompt", key="detailed_save")
-                                if save_clicked:
-
-
-                                    st.write(f"Analysis result in session state: {'analysis_result' in st.session_state}")
-                                    if 'analysis_result' in st.session_state:
-
-                                        st.write(f"Analysis result keys: {list(st.session_state.analysis_result.keys()) if isinstance(st.session_state.analysis_result, dict) else 'Not a dict'}")
-                                        
-                                        if 'analysis_result' in st.session_state:
-                                            try:
-                                                result = st.session_state.analysis_result
-                                                
-                                                # Prepare data for saving
-                                                save_data = {
-                                                    'context': result.get('subject', ''),
-                                                    'art_style': result.get('art_style', ''),
-                                                    'camera_angle': result.get('camera_angle', ''),
-                                                    'environment': result.get('environment', ''),
-                                                    'lighting': result.get('lighting', ''),
-                                                    'focus': result.get('focus', ''),
-                                                    'color_palette': result.get('color_palette', ''),
-                                                    'composition': result.get('composition', ''),
-                                                    'modifiers': result.get('modifiers', ''),
-                                                    'generated_prompt': result.get('suggested_prompt', '')
-                                                }
-                                                
-                                                # Save to CSV
-                                                prompt_id = data_manager.save_prompt(save_data)
-                                                st.success(f"✅ Analysis saved as prompt with ID: {prompt_id}")
-                                                logger.info(f"Image analysis saved as prompt with ID: {prompt_id}")
-                                                
-                                            except Exception as e:
-                                                st.error(f"Error saving analysis: {str(e)}")
-                                        else:
-                                            st.warning("Please analyze an image first")
+                            columns = st.columns(2)
+                            for column, fields in zip(columns, _ANALYSIS_RESULT_COLUMNS):
+                                with column:
+                                    for field, label in fields:
+                                        st.text_input(label, value=analysis_result.get(field, ""), disabled=True)
+                            with columns[1]:
+                                st.markdown("**Modifiers**")
+                                st.code(analysis_result.get("modifiers", ""), language=None)
                             
+                            context = analysis_result.get("subject", "") or suggested_prompt
+                            kind = "detailed"
                         else:
                             # Text analysis
                             st.subheader("📝 Analysis Description")
-                            st.text_area("Description", value=analysis_result.get("description", ""), height=200, disabled=True)
+                            st.markdown("**Description**")
+                            st.code(analysis_result.get("description", ""), language=None)
                             
                             st.subheader("🎯 Suggested Prompt")
-                            suggested_prompt = analysis_result.get("suggested_prompt", "")
-                            st.text_area("Generated Prompt", value=suggested_prompt, height=150, disabled=True)
-                            
-                            # Send to Generate Prompt button (text/simple analysis)
-                            text_context = analysis_result.get("description", "") or suggested_prompt
-                            if st.button("Send to Generate Prompt", key="send_to_generate_prompt_text"):
-                                st.session_state["param_context"] = text_context
-                                st.success("Sent to Generate Prompt! Switch to the 'Generate Prompt' tab to continue.")
-
-                            # Copy to clipboard button for generated prompt (text analysis)
-                            if suggested_prompt:
-                                components.html(
-                                    f"""
-                                    <div>
-                                      <button style=\"padding:8px 12px; margin-top:6px;\" onclick=\"navigator.clipboard.writeText(text_{id(suggested_prompt)}).then(()=>{{{{this.innerText='Copied!'; setTimeout(()=>this.innerText='Copy Generated Prompt',1500)}}}});\">Copy Generated Prompt</button>
-                                      <script>
-                                        const text_{id(suggested_prompt)} = {json.dumps(suggested_prompt)};
-                                      </script>
-                                    </div>
-                                    """,
-                                    height=60,
-                                )
-
-                            # Store for saving
-                            st.session_state.analysis_result = analysis_result
-                            
-                            # Save prompt button for text analysis
-                            if st.button("💾 Save Analysis as Prompt"):
-
-
-                                st.write(f"Analysis result in session state: {'analysis_result' in st.session_state}")
-                                if 'analysis_result' in st.session_state:
-
-                                    st.write(f"Analysis result keys: {list(st.session_state.analysis_result.keys()) if isinstance(st.session_state.analysis_result, dict) else 'Not a dict'}")
-                                else:
-
-                                    st.warning("No analysis result found. Please analyze an image first.")
-                                    return
-                                
-                                if 'analysis_result' in st.session_state:
-                                    try:
-                                        result = st.session_state.analysis_result
-                                        
-                                        # Prepare data for saving
-                                        save_data = {
-                                            'context': 'Image Analysis',
-                                            'art_style': '',
-                                            'camera_angle': '',
-                                            'environment': '',
-                                            'lighting': '',
-                                            'focus': '',
-                                            'color_palette': '',
-                                            'composition': '',
-                                            'modifiers': result.get('description', ''),
-                                            'generated_prompt': result.get('suggested_prompt', '')
-                                        }
-                                        
-                                        # Save to CSV
-                                        prompt_id = data_manager.save_prompt(save_data)
-                                        st.success(f"✅ Analysis saved as prompt with ID: {prompt_id}")
-                                        logger.info(f"Image analysis saved as prompt with ID: {prompt_id}")
-                                        
-                                    except Exception as e:
-                                        st.error(f"Error saving analysis: {str(e)}")
-                                else:
-                                    st.warning("Please analyze an image first")
+                            context = analysis_result.get("description", "") or suggested_prompt
+                            kind = "text"
+                        
+                        # Generated prompt and its actions, shared by both result kinds;
+                        # read-only text goes out as code blocks rather than disabled text areas
+                        st.markdown("**Generated Prompt**")
+                        st.code(suggested_prompt, language=None)
+                        
+                        if st.button("Send to Generate Prompt", key=f"send_to_generate_prompt_{kind}"):
+                            st.session_state["param_context"] = context
+                            st.success("Sent to Generate Prompt! Switch to the 'Generate Prompt' tab to continue.")
+                        
+                        # Copy to clipboard button for generated prompt
+                        if suggested_prompt:
+                            _copy_button(text=suggested_prompt, key=f"copy_analysis_prompt_{kind}")
+                        
+                        if st.button("💾 Save Analysis as Prompt", key=f"{kind}_save"):
+                            _save_analysis_as_prompt(analysis_result, structured=structured)
                     
             except Exception as e:
                 st.error(f"Error analyzing image: {str(e)}")
                 logger.error(f"Image analysis error: {str(e)}")
 
-def generate_images_tab():
-    """Tab for generating images from prompts"""
+def image_analysis_tab():
+    """Tab for analyzing images and generating prompts"""
     st.markdown("""
-        <h1 class="page-header">Generate Images</h1>
-        <p class="page-subtitle">Generate images from your Flux prompts using AI</p>
-    """, unsafe_allow_html=True)
+        <h1 class="page-header">Image Analysis & Prompt Generation</h1>
+        <p class="page-subtitle">Upload an image to analyze and generate a Flux prompt from it</p>
+        <style>%s</style>
+    """ % _ANALYSIS_CSS, unsafe_allow_html=True)
     
-    # Check if image generator is available
-    if 'image_generator' not in st.session_state:
-        st.warning("Image generation is not available. Please check your API keys in the .env file.")
-        st.info("Required: OPENAI_API_KEY and BLACK_FOREST_LABS_API_KEY")
+    analyzer = _get_openai_service(_shared_image_analyzer)
+    if analyzer is None:
         return
     
-    generator = st.session_state.image_generator
-    
-    # Check if ComfyUI should be available but isn't in providers
-    # This handles the case where ComfyUI started after the app
-    providers = generator.get_available_providers()
-    if "comfyui" not in providers:
-        try:
-            from image_provider_router import ImageProviderRouter
-            config = Config()
-            test_router = ImageProviderRouter(config)
-            test_providers = test_router.get_available_providers()
-            if "comfyui" in test_providers:
-                # ComfyUI is now available, refresh the generator
-                # Clear old instance first
-                if 'image_generator' in st.session_state:
-                    del st.session_state.image_generator
-                # Create fresh instance
-                st.session_state.image_generator = ImageGenerator()
-                generator = st.session_state.image_generator
-                providers = generator.get_available_providers()
-                logger.info(f"Auto-refreshed ImageGenerator. Providers now: {list(providers.keys())}")
-                # Show success message
-                st.success("✓ ComfyUI detected! Providers updated.")
-                st.rerun()
-        except Exception as e:
-            logger.debug(f"Provider refresh check in tab failed: {e}")
-    
+    _image_analysis_view(analyzer)
+
+@lru_cache(maxsize=None)
+def _image_style(value: str) -> Optional["ImageStyle"]:
+    """The ImageStyle for a style value, or None; resolved once per value"""
+    from image_provider import ImageStyle
+    try:
+        return ImageStyle(value)
+    except ValueError:
+        return None
+
+# Image styles offered on Generate Images: ImageStyle value -> label
+_IMAGE_STYLE_OPTIONS = {
+    "fast_draft": "Fast Draft - Quick, lower quality",
+    "photoreal": "Photorealistic - High quality realistic images",
+    "brand_layout": "Brand Layout - Marketing visuals",
+    "portrait": "Portrait - Professional portraits",
+    "product": "Product - Product photography",
+    "logo_text": "Logo/Text - Logos and text-based images",
+    "artistic": "Artistic - Creative styles",
+    "cinematic": "Cinematic - Film-quality images"
+}
+
+# Provider labels that don't follow the "NAME (model)" pattern
+_PROVIDER_DISPLAY_NAMES = {
+    "comfyui": "ComfyUI (SDXL - Local)",
+    "openai": "OpenAI (DALL-E 3)",
+}
+
+@st.cache_resource(show_spinner=False)
+def _http_session():
+    """One requests session for all sessions, so image downloads reuse connections"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    session = requests.Session()
+    # Retry transient failures of the image CDNs instead of dropping the download button
+    adapter = HTTPAdapter(pool_maxsize=16, max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504)))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+@st.cache_data(ttl=3600, max_entries=16, show_spinner=False)
+def _fetch_image_bytes(url: str) -> bytes:
+    """Download a generated image for its download button, once per URL"""
+    response = _http_session().get(url, timeout=30)
+    response.raise_for_status()
+    return response.content
+
+def _result_image_bytes(generator, result) -> bytes:
+    """Bytes of a URL result's first image, from its vault copy when one was saved"""
+    vault_id = (result.metadata or {}).get("vault_id")
+    image_path = generator.vault.get_image_path(vault_id) if vault_id and generator.vault else None
+    if image_path and image_path.exists():
+        return image_path.read_bytes()
+    return _fetch_image_bytes(result.get_image_url(0))
+
+def _result_details(result) -> dict:
+    """What session state keeps of a generation result: no image bytes or URL lists"""
+    return {"provider": result.provider, "model": result.model, "metadata": result.metadata}
+
+@st.fragment
+def _generate_images_view(generator, providers):
+    """Prompt, style, provider and preview; their widgets rerun only this fragment"""
     # Two-column layout
     col_left, col_right = st.columns([1.2, 1])
     
@@ -1892,37 +1741,25 @@ def generate_images_tab():
         # Load prompt from repository (if available)
         if st.session_state.get('prompt_repository'):
             repository = st.session_state.prompt_repository
-            master_prompts = repository.get_all_master_prompts()
-            if master_prompts:
+            prompt_contents = _master_prompt_contents(repository, _repository_version(repository))
+            if prompt_contents:
                 st.markdown("**Or select from saved prompts:**")
-                prompt_options = ["None"] + [p['name'] for p in master_prompts]
-                selected_prompt = st.selectbox("Load saved prompt", prompt_options)
+                selected_prompt = st.selectbox("Load saved prompt", ["None"] + list(prompt_contents))
                 if selected_prompt != "None":
-                    selected_prompt_data = next((p for p in master_prompts if p['name'] == selected_prompt), None)
-                    if selected_prompt_data:
-                        prompt = selected_prompt_data.get('content', prompt)
-                        st.text_area("Loaded prompt", value=prompt, height=100, disabled=True, key="loaded_prompt_display")
+                    # One dict lookup instead of scanning the prompt list
+                    prompt = prompt_contents[selected_prompt] or prompt
+                    st.markdown("**Loaded prompt**")
+                    st.code(prompt, language=None)
         
         # Style selection
         st.markdown("""
             <h3 class="section-title-small">Image Style</h3>
         """, unsafe_allow_html=True)
         
-        style_options = {
-            "fast_draft": "Fast Draft - Quick, lower quality",
-            "photoreal": "Photorealistic - High quality realistic images",
-            "brand_layout": "Brand Layout - Marketing visuals",
-            "portrait": "Portrait - Professional portraits",
-            "product": "Product - Product photography",
-            "logo_text": "Logo/Text - Logos and text-based images",
-            "artistic": "Artistic - Creative styles",
-            "cinematic": "Cinematic - Film-quality images"
-        }
-        
         selected_style = st.selectbox(
             "Select image style",
-            options=list(style_options.keys()),
-            format_func=lambda x: style_options[x],
+            options=list(_IMAGE_STYLE_OPTIONS),
+            format_func=_IMAGE_STYLE_OPTIONS.__getitem__,
             help="Choose the style that best matches your needs"
         )
         
@@ -1966,50 +1803,25 @@ def generate_images_tab():
         # Add refresh button for providers
         col_refresh, col_provider_label = st.columns([1, 4])
         with col_refresh:
-            refresh_clicked = st.button("🔄 Refresh Providers", help="Refresh provider list to detect ComfyUI if it just started", key="refresh_providers_btn")
-            if refresh_clicked:
-                # Force clear and reinitialize ImageGenerator
-                try:
-                    # Clear the cached generator
-                    if 'image_generator' in st.session_state:
-                        del st.session_state.image_generator
-                    # Create fresh instance
-                    st.session_state.image_generator = ImageGenerator()
-                    generator = st.session_state.image_generator
-                    # Verify ComfyUI is now available
-                    new_providers = generator.get_available_providers()
-                    if "comfyui" in new_providers:
-                        st.success(f"✓ Providers refreshed! ComfyUI is now available.")
-                    else:
-                        st.warning("Providers refreshed, but ComfyUI not detected. Make sure ComfyUI is running.")
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"Failed to refresh: {e}")
-                    logger.error(f"Provider refresh error: {e}", exc_info=True)
+            if st.button("🔄 Refresh Providers", help="Refresh provider list to detect ComfyUI if it just started", key="refresh_providers_btn"):
+                # Drop the shared generator and the ComfyUI probes; the full rerun
+                # builds the generator once and shows the new provider list
+                _shared_image_generator.clear()
+                _comfyui_available.clear()
+                _comfyui_server_reachable.clear()
+                st.rerun()
         
         with col_provider_label:
             st.markdown("**Provider**")
         
-        # Get providers (may have been refreshed above or in the check at top of function)
-        providers = generator.get_available_providers()
-        
-        # Debug: Log available providers
-        logger.info(f"Available providers in UI: {list(providers.keys())}")
+        # providers was read once when this view was rendered
+        logger.debug("Available providers in UI: %s", list(providers))
         
         if providers:
-            provider_names = list(providers.keys())
-            provider_options = {}
-            for name, info in providers.items():
-                # Better display names
-                if name == "comfyui":
-                    display_name = f"ComfyUI (SDXL - Local)"
-                elif name == "flux":
-                    display_name = f"FLUX ({info['model']})"
-                elif name == "openai":
-                    display_name = f"OpenAI (DALL-E 3)"
-                else:
-                    display_name = f"{name.upper()} ({info['model']})"
-                provider_options[name] = display_name
+            provider_options = {
+                name: _PROVIDER_DISPLAY_NAMES.get(name) or f"{name.upper()} ({info['model']})"
+                for name, info in providers.items()
+            }
             
             # Check for ComfyUI status
             comfyui_available = "comfyui" in providers
@@ -2020,21 +1832,13 @@ def generate_images_tab():
             if not comfyui_available:
                 # Try to check if ComfyUI server might be available but not initialized
                 try:
-                    config = Config()
-                    comfyui_server = config.get_comfyui_server_address()
-                    import urllib.request
-                    import urllib.error
-                    try:
-                        # Use longer timeout and better error handling
-                        urllib.request.urlopen(f"http://{comfyui_server}/system_stats", timeout=5)
+                    comfyui_server = st.session_state.config.get_comfyui_server_address()
+                    if _comfyui_server_reachable(comfyui_server):
                         # Server is reachable but provider not initialized - suggest refresh
                         comfyui_status = f"⚠️ ComfyUI server at {comfyui_server} is reachable but not initialized. Click '🔄 Refresh Providers' button above."
-                    except urllib.error.URLError:
+                    else:
                         # Server not reachable
                         comfyui_status = f"ℹ️ ComfyUI server at {comfyui_server} not reachable. Start ComfyUI to enable local generation."
-                    except Exception:
-                        # Other errors - don't show confusing message
-                        pass
                 except Exception:
                     pass
             else:
@@ -2085,7 +1889,7 @@ def generate_images_tab():
             with st.spinner("Generating image... This may take 30-60 seconds."):
                 try:
                     # Convert style string to enum
-                    style_enum = ImageStyle(selected_style) if selected_style in [s.value for s in ImageStyle] else None
+                    style_enum = _image_style(selected_style)
                     
                     # Use selected provider if not "auto"
                     provider_override = None if selected_provider == "auto" else selected_provider
@@ -2109,11 +1913,9 @@ def generate_images_tab():
                         image_bytes = result.get_image_bytes(0)
                         
                         if image_bytes:
-                            # Handle binary image data (e.g., from ComfyUI)
-                            from PIL import Image as PILImage
-                            import io
-                            img = PILImage.open(io.BytesIO(image_bytes))
-                            st.image(img, caption=f"Generated Image - {selected_style}", use_container_width=True)
+                            # Handle binary image data (e.g., from ComfyUI); st.image takes the
+                            # encoded bytes as-is, no PIL decode and re-encode
+                            st.image(image_bytes, caption=f"Generated Image - {selected_style}", use_container_width=True)
                             
                             # Download button
                             st.download_button(
@@ -2126,24 +1928,18 @@ def generate_images_tab():
                             # Handle URL-based images (e.g., from OpenAI, Flux API)
                             st.image(image_url, caption=f"Generated Image - {selected_style}", use_container_width=True)
                             
-                            # Download button
-                            try:
-                                import requests
-                                img_response = requests.get(image_url)
-                                st.download_button(
-                                    label="📥 Download Image",
-                                    data=img_response.content,
-                                    file_name=f"generated_image_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png",
-                                    mime="image/png"
-                                )
-                            except Exception as e:
-                                logger.warning(f"Could not download image: {e}")
-                                st.info(f"Image URL: {image_url}")
+                            # Download button; the image is fetched only when clicked
+                            st.download_button(
+                                label="📥 Download Image",
+                                data=lambda: _result_image_bytes(generator, result),
+                                file_name=f"generated_image_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png",
+                                mime="image/png"
+                            )
                         else:
                             st.warning("Image generated but no image data available. Check metadata.")
                         
                         # Save to session state
-                        st.session_state.last_generated_image = result
+                        st.session_state.last_generated_image = _result_details(result)
                         
                     else:
                         st.error(f"Generation failed: {result.error}")
@@ -2171,43 +1967,67 @@ def generate_images_tab():
     
     # Show last generated image info
     if 'last_generated_image' in st.session_state:
-        result = st.session_state.last_generated_image
         st.markdown("---")
         with st.expander("Last Generated Image Details"):
-            st.json({
-                "provider": result.provider,
-                "model": result.model,
-                "metadata": result.metadata
-            })
+            st.json(st.session_state.last_generated_image)
 
-def image_editing_tab():
-    """Tab for image-to-image editing"""
+def generate_images_tab():
+    """Tab for generating images from prompts"""
     st.markdown("""
-        <h1 class="page-header">Image Editing</h1>
-        <p class="page-subtitle">Transform and edit images using AI image-to-image generation</p>
+        <h1 class="page-header">Generate Images</h1>
+        <p class="page-subtitle">Generate images from your Flux prompts using AI</p>
     """, unsafe_allow_html=True)
     
     # Check if image generator is available
-    if 'image_generator' not in st.session_state:
-        st.warning("Image editing is not available. Please check your API keys in the .env file.")
-        st.info("Required: OPENAI_API_KEY and BLACK_FOREST_LABS_API_KEY (for img2img)")
-        return
-    
-    generator = st.session_state.image_generator
-    
-    # Check if Flux provider supports img2img
-    providers = generator.get_available_providers()
-    flux_available = False
-    for name, info in providers.items():
-        if "flux" in name.lower() and info['features'].get('img2img', False):
-            flux_available = True
-            break
-    
-    if not flux_available:
-        st.error("Image-to-image editing requires Flux provider with img2img support.")
-        st.info("Make sure you have BLACK_FOREST_LABS_API_KEY configured in your .env file.")
+    generator = _get_image_generator()
+    if generator is None:
+        st.warning("Image generation is not available. Please check your API keys in the .env file.")
+        st.info("Required: OPENAI_API_KEY and BLACK_FOREST_LABS_API_KEY")
         return
     
+    # _get_image_generator() has already picked up a ComfyUI server that started after the app
+    _generate_images_view(generator, generator.get_available_providers())
+
+# Optional style overrides offered on Image Editing
+_EDIT_STYLE_OPTIONS = {
+    "None": "No style override",
+    "photoreal": "Photorealistic",
+    "cinematic": "Cinematic",
+    "artistic": "Artistic",
+}
+
+# Upload types the edit API takes as-is; anything else is re-encoded
+_PASSTHROUGH_IMAGE_TYPES = {"image/png", "image/jpeg"}
+
+# Default cap on the longest side of an image sent for editing
+_EDIT_MAX_EDGE = 2048
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _source_data_url(file_id: str, _uploaded_file, max_edge: int) -> str:
+    """Data URL of an upload for the edit API, downscaled to max_edge; once per file_id and cap"""
+    _uploaded_file.seek(0)
+    try:
+        with Image.open(_uploaded_file) as img:
+            if max(img.size) <= max_edge and _uploaded_file.type in _PASSTHROUGH_IMAGE_TYPES:
+                # Send small PNG/JPEG uploads untouched: no decode, no lossy re-encode
+                mime, buffered = _uploaded_file.type, _uploaded_file
+            else:
+                img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+                # JPEG whenever there is no alpha or palette to keep; it encodes far faster than PNG
+                format_ext = 'JPEG' if img.mode in ("RGB", "L", "CMYK") else 'PNG'
+                buffered = io.BytesIO()
+                img.save(buffered, format=format_ext, quality=90)  # PNG ignores quality
+                mime = f"image/{format_ext.lower()}"
+    finally:
+        _uploaded_file.seek(0)
+    # Encode from a view of the buffer instead of copying the image bytes out first
+    with buffered.getbuffer() as view:
+        img_base64 = b64encode(view).decode('ascii')
+    return f"data:{mime};base64,{img_base64}"
+
+@st.fragment
+def _image_editing_view(generator):
+    """Upload, edit settings and result; their widgets rerun only this fragment"""
     # Three-column layout: Input | Controls | Output
     col_input, col_controls, col_output = st.columns([1, 1, 1])
     
@@ -2225,32 +2045,18 @@ def image_editing_tab():
         )
         
         source_image = None
-        source_image_url = None
         
         if uploaded_file is not None:
-            # Display uploaded image
-            from PIL import Image as PILImage
-            import io
-            import base64
-            
-            source_image = PILImage.open(uploaded_file)
+            # Display uploaded image; st.image takes the encoded bytes as-is
+            source_image = uploaded_file.getvalue()
             st.image(source_image, caption="Source Image", use_container_width=True)
             
-            # Convert to base64 data URL for API
-            buffered = io.BytesIO()
-            # Save in original format or PNG
-            format_ext = uploaded_file.type.split('/')[-1].upper()
-            if format_ext == 'JPEG':
-                format_ext = 'JPEG'
-            else:
-                format_ext = 'PNG'
-            source_image.save(buffered, format=format_ext)
-            img_bytes = buffered.getvalue()
-            img_base64 = base64.b64encode(img_bytes).decode('utf-8')
-            source_image_url = f"data:image/{format_ext.lower()};base64,{img_base64}"
-            
-            # Show image info
-            st.caption(f"Size: {source_image.size[0]}x{source_image.size[1]} pixels")
+            # Show image info; PIL reads only the header here
+            try:
+                with Image.open(uploaded_file) as img:
+                    st.caption(f"Size: {img.size[0]}x{img.size[1]} pixels")
+            finally:
+                uploaded_file.seek(0)
     
     with col_controls:
         st.markdown("""
@@ -2281,17 +2087,10 @@ def image_editing_tab():
             <h3 class="section-title-small">Style (Optional)</h3>
         """, unsafe_allow_html=True)
         
-        style_options = {
-            "None": "No style override",
-            "photoreal": "Photorealistic",
-            "cinematic": "Cinematic",
-            "artistic": "Artistic",
-        }
-        
         selected_style = st.selectbox(
             "Apply style",
-            options=list(style_options.keys()),
-            format_func=lambda x: style_options[x],
+            options=list(_EDIT_STYLE_OPTIONS),
+            format_func=_EDIT_STYLE_OPTIONS.__getitem__,
             help="Optional: Apply a specific style to the transformation"
         )
         
@@ -2311,6 +2110,15 @@ def image_editing_tab():
                 placeholder="blurry, distorted, low quality",
                 help="What to avoid in the edited image"
             )
+            max_edge = st.number_input(
+                "Max input size (px)",
+                min_value=512,
+                max_value=4096,
+                value=_EDIT_MAX_EDGE,
+                step=256,
+                help="Longer sides are downscaled to this before the image is sent",
+                key="img2img_max_edge"
+            )
         
         # Generate button
         generate_button = st.button("🖼️ Generate Edited Image", type="primary", use_container_width=True)
@@ -2326,18 +2134,14 @@ def image_editing_tab():
                 st.warning("⚠ Please upload an image first")
             elif not prompt:
                 st.warning("⚠ Please enter an edit prompt")
-            elif not source_image_url:
-                st.warning("⚠ Could not process uploaded image")
             else:
                 with st.spinner("Editing image... This may take 30-60 seconds."):
                     try:
-                        # Convert style string to enum
-                        style_enum = None
-                        if selected_style != "None":
-                            try:
-                                style_enum = ImageStyle(selected_style)
-                            except ValueError:
-                                pass
+                        # Base64 data URL for API, built once per upload and size cap
+                        source_image_url = _source_data_url(uploaded_file.file_id, uploaded_file, int(max_edge))
+                        
+                        # Convert style string to enum ("None" is not a style)
+                        style_enum = _image_style(selected_style)
                         
                         # Generate edited image using img2img with Flux Kontext
                         # The router will automatically use Flux Kontext from routing config
@@ -2371,25 +2175,19 @@ def image_editing_tab():
                                         st.caption("**After**")
                                         st.image(image_url, use_container_width=True)
                                 
-                                # Download button
-                                try:
-                                    import requests
-                                    img_response = requests.get(image_url)
-                                    st.download_button(
-                                        label="📥 Download Edited Image",
-                                        data=img_response.content,
-                                        file_name=f"edited_image_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png",
-                                        mime="image/png",
-                                        use_container_width=True
-                                    )
-                                except Exception as e:
-                                    logger.warning(f"Could not download image: {e}")
-                                    st.info(f"Image URL: {image_url}")
+                                # Download button; the image is fetched only when clicked
+                                st.download_button(
+                                    label="📥 Download Edited Image",
+                                    data=lambda: _result_image_bytes(generator, result),
+                                    file_name=f"edited_image_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png",
+                                    mime="image/png",
+                                    use_container_width=True
+                                )
                             else:
                                 st.warning("Image generated but URL not available. Check metadata.")
                             
                             # Save to session state
-                            st.session_state.last_edited_image = result
+                            st.session_state.last_edited_image = _result_details(result)
                         
                         else:
                             st.error(f"Editing failed: {result.error}")
@@ -2415,6 +2213,35 @@ def image_editing_tab():
             - Use negative prompts to avoid unwanted changes
             """)
 
+# Vault images rendered per page (a multiple of the 3-column grid)
+_VAULT_PAGE_SIZE = 12
+
+def image_editing_tab():
+    """Tab for image-to-image editing"""
+    st.markdown("""
+        <h1 class="page-header">Image Editing</h1>
+        <p class="page-subtitle">Transform and edit images using AI image-to-image generation</p>
+    """, unsafe_allow_html=True)
+    
+    # Check if image generator is available
+    generator = _get_image_generator()
+    if generator is None:
+        st.warning("Image editing is not available. Please check your API keys in the .env file.")
+        st.info("Required: OPENAI_API_KEY and BLACK_FOREST_LABS_API_KEY (for img2img)")
+        return
+    
+    # Check if Flux provider supports img2img
+    flux_available = any(
+        "flux" in name.lower() and info['features'].get('img2img', False)
+        for name, info in generator.get_available_providers().items()
+    )
+    if not flux_available:
+        st.error("Image-to-image editing requires Flux provider with img2img support.")
+        st.info("Make sure you have BLACK_FOREST_LABS_API_KEY configured in your .env file.")
+        return
+    
+    _image_editing_view(generator)
+
 def image_vault_tab():
     """Tab for viewing and managing saved images in the vault"""
     st.markdown("""
@@ -2423,11 +2250,11 @@ def image_vault_tab():
     """, unsafe_allow_html=True)
     
     # Check if image generator and vault are available
-    if 'image_generator' not in st.session_state:
+    generator = _get_image_generator()
+    if generator is None:
         st.warning("Image Vault is not available. Please initialize the image generator first.")
         return
     
-    generator = st.session_state.image_generator
     if not generator.vault:
         st.warning("Image Vault is not initialized. Images will not be automatically saved.")
         return
@@ -2461,18 +2288,19 @@ def image_vault_tab():
         )
     
     with col_filter2:
-        providers_list = ["All"] + list(set(stats["by_provider"].keys()))
+        # Stats keys are already unique, and "All" keeps both lists non-empty
+        providers_list = ["All", *stats["by_provider"]]
         filter_provider = st.selectbox(
             "Filter by Provider",
-            options=providers_list if providers_list else ["All"],
+            options=providers_list,
             help="Filter images by provider"
         )
     
     with col_filter3:
-        styles_list = ["All"] + [s for s in stats["by_style"].keys() if s != "none"]
+        styles_list = ["All", *(s for s in stats["by_style"] if s != "none")]
         filter_style = st.selectbox(
             "Filter by Style",
-            options=styles_list if styles_list else ["All"],
+            options=styles_list,
             help="Filter images by style"
         )
     
@@ -2498,52 +2326,66 @@ def image_vault_tab():
     # Display images in grid
     st.markdown(f"### Showing {len(images)} image(s)")
     
+    # Only the current page of images is read from disk and sent to the browser
+    total_pages = max(1, -(-len(images) // _VAULT_PAGE_SIZE))
+    page = 1
+    if total_pages > 1:
+        page = st.number_input("Page", min_value=1, max_value=total_pages, value=1, step=1,
+                               key="vault_page")
+    page_start = (page - 1) * _VAULT_PAGE_SIZE
+    page_images = images[page_start:page_start + _VAULT_PAGE_SIZE]
+    if total_pages > 1:
+        st.caption(f"Page {page} of {total_pages} - showing {page_start + 1}-{page_start + len(page_images)}")
+    
     # Create grid layout - 3 columns
     num_cols = 3
     cols = st.columns(num_cols)
     
-    for idx, img_meta in enumerate(images):
+    for idx, img_meta in enumerate(page_images):
         col_idx = idx % num_cols
         with cols[col_idx]:
             try:
                 image_path = vault.get_image_path(img_meta["id"])
                 
                 if image_path and image_path.exists():
-                    # Display image
-                    st.image(str(image_path), use_container_width=True)
+                    # Display the stored thumbnail rather than the full-size file
+                    thumb_path = vault.get_thumbnail_path(img_meta["id"])
+                    st.image(str(thumb_path or image_path), use_container_width=True)
                     
-                    # Image info
+                    # Image info and truncated prompt, as one element
                     source_type_label = "✏️" if img_meta.get("source_type") == "edited" else "🎨"
-                    st.caption(f"{source_type_label} {img_meta.get('provider', 'unknown').upper()} | {img_meta.get('date', '')}")
-                    
-                    # Truncated prompt
                     prompt_preview = img_meta.get("prompt", "")[:60]
                     if len(img_meta.get("prompt", "")) > 60:
                         prompt_preview += "..."
-                    st.caption(f"*{prompt_preview}*")
+                    st.caption(
+                        f"{source_type_label} {img_meta.get('provider', 'unknown').upper()} | {img_meta.get('date', '')}  \n"
+                        f"*{prompt_preview}*"
+                    )
                     
-                    # Expandable details
+                    # Expandable details; one markdown block instead of an element per field
                     with st.expander("Details"):
-                        st.write(f"**ID:** {img_meta['id']}")
-                        st.write(f"**Provider:** {img_meta.get('provider', 'N/A')}")
-                        st.write(f"**Model:** {img_meta.get('model', 'N/A')}")
-                        st.write(f"**Style:** {img_meta.get('style', 'N/A')}")
-                        st.write(f"**Date:** {img_meta.get('date', 'N/A')} {img_meta.get('time', '')}")
-                        st.write(f"**Prompt:** {img_meta.get('prompt', 'N/A')}")
+                        st.markdown(
+                            f"**ID:** {img_meta['id']}  \n"
+                            f"**Provider:** {img_meta.get('provider', 'N/A')}  \n"
+                            f"**Model:** {img_meta.get('model', 'N/A')}  \n"
+                            f"**Style:** {img_meta.get('style', 'N/A')}  \n"
+                            f"**Date:** {img_meta.get('date', 'N/A')} {img_meta.get('time', '')}  \n"
+                            f"**Prompt:** {img_meta.get('prompt', 'N/A')}"
+                        )
                         
                         # Download and delete buttons
                         col_download, col_delete = st.columns(2)
                         with col_download:
                             try:
-                                with open(image_path, 'rb') as f:
-                                    st.download_button(
-                                        "📥 Download",
-                                        data=f.read(),
-                                        file_name=img_meta["filename"],
-                                        mime="image/png",
-                                        key=f"download_{img_meta['id']}",
-                                        use_container_width=True
-                                    )
+                                st.download_button(
+                                    "📥 Download",
+                                    # Read only when clicked
+                                    data=image_path.read_bytes,
+                                    file_name=img_meta["filename"],
+                                    mime="image/png",
+                                    key=f"download_{img_meta['id']}",
+                                    use_container_width=True
+                                )
                             except Exception:
                                 pass
                         
@@ -2561,10 +2403,89 @@ def image_vault_tab():
             except Exception as e:
                 st.error(f"Error loading image: {e}")
                 logger.error(f"Error displaying vault image: {e}")
-    
-    # Show more if there are many images
-    if len(images) > 9:
-        st.info(f"Showing first 9 images. Total: {len(images)}. Use filters to narrow down results.")
+
+def _repository_version(repository) -> tuple:
+    """Identify the current contents of the repository file (path, mtime, size)"""
+    try:
+        stat = os.stat(repository.repo_file)
+        return (repository.repo_file, stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return (repository.repo_file, 0, 0)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _repository_summary(_repository, repo_version: tuple) -> dict:
+    """Repository summary, re-read only when the repository file changes"""
+    return _repository.get_repository_summary()
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _repository_master_prompts(_repository, repo_version: tuple) -> list:
+    """Master prompt list, re-read only when the repository file changes"""
+    return _repository.get_all_master_prompts()
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _master_prompt_contents(_repository, repo_version: tuple) -> dict:
+    """Master prompt content by name (first one wins on duplicate names)"""
+    contents = {}
+    for prompt in _repository_master_prompts(_repository, repo_version):
+        contents.setdefault(prompt['name'], prompt.get('content'))
+    return contents
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _master_prompts_table(_repository, repo_version: tuple) -> pd.DataFrame:
+    """Master prompt metadata table with dates parsed in one vectorized pass"""
+    df = pd.DataFrame(
+        _repository_master_prompts(_repository, repo_version),
+        columns=['name', 'category', 'usage_count', 'created', 'last_used']
+    )
+    df['usage_count'] = df['usage_count'].fillna(0).astype(int)
+    for column in ('created', 'last_used'):
+        df[column] = pd.to_datetime(df[column], errors='coerce', format='ISO8601').dt.date
+    return df.rename(columns={
+        'name': 'Name', 'category': 'Category', 'usage_count': 'Usage Count',
+        'created': 'Created', 'last_used': 'Last Used',
+    })
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _repository_knowledge_preview(_repository, repo_version: tuple) -> dict:
+    """First items and total count per knowledge base category, re-read only when the file changes"""
+    return _repository.get_knowledge_base_preview(limit=10)
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _repository_knowledge_search(_repository, search_term: str, repo_version: tuple) -> dict:
+    """Knowledge base search results, recomputed only for new terms or a changed repository file"""
+    return _repository.search_knowledge_base(search_term)
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _repository_export_bytes(_repository, repo_version: tuple) -> bytes:
+    """Repository JSON for download, re-serialized only when the repository file changes"""
+    return _repository.export_repository_bytes()
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _repository_knowledge_categories(_repository, repo_version: tuple) -> list:
+    """Knowledge base category names, re-read only when the repository file changes"""
+    return _repository.get_knowledge_base_categories()
+
+def _metric_row_html(metrics) -> str:
+    """Render (label, value) pairs as one row of st.metric-style blocks"""
+    items = "".join(
+        f'<div class="metric-item"><div class="metric-label">{html.escape(label)}</div>'
+        f'<div class="metric-value">{html.escape(str(value))}</div></div>'
+        for label, value in metrics
+    )
+    return f'<div class="metric-row">{items}</div>'
+
+# Master prompt expanders shown per page
+_MASTER_PROMPTS_PAGE_SIZE = 20
+
+# Master prompt characters sent to the browser before "Show full" is clicked
+_MASTER_PROMPT_PREVIEW_CHARS = 500
+
+# Shortest knowledge base search term that triggers a search
+_KNOWLEDGE_SEARCH_MIN_CHARS = 3
+
+def _show_full_master_prompt(show_key: str):
+    """Reveal the full content of a master prompt for the rest of the session"""
+    st.session_state[show_key] = True
 
 def prompt_repository_tab():
     """Tab for managing the prompt repository"""
@@ -2575,19 +2496,19 @@ def prompt_repository_tab():
     
     repository = st.session_state.prompt_repository
     
-    # Repository summary
-    summary = repository.get_repository_summary()
+    # Repository summary (cached until the repository file changes)
+    repo_version = _repository_version(repository)
+    summary = _repository_summary(repository, repo_version)
     
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric("Master Prompts", summary['total_master_prompts'])
-    with col2:
-        st.metric("Knowledge Items", summary['total_knowledge_items'])
-    with col3:
-        st.metric("Categories", len(summary['categories']['knowledge_base']))
-    with col4:
-        if summary['most_used_prompt']:
-            st.metric("Most Used", summary['most_used_prompt']['name'][:20] + "...")
+    # All four metrics in a single markdown element
+    metrics = [
+        ("Master Prompts", summary['total_master_prompts']),
+        ("Knowledge Items", summary['total_knowledge_items']),
+        ("Categories", len(summary['categories']['knowledge_base'])),
+    ]
+    if summary['most_used_prompt']:
+        metrics.append(("Most Used", summary['most_used_prompt']['name'][:20] + "..."))
+    st.markdown(_metric_row_html(metrics), unsafe_allow_html=True)
     
     # Tabs for different repository functions
     repo_tab1, repo_tab2, repo_tab3 = st.tabs(["Master Prompts", "Knowledge Base", "Search & Export"])
@@ -2596,20 +2517,32 @@ def prompt_repository_tab():
         st.subheader("🎯 Master Prompts")
         
         # Display existing master prompts
-        master_prompts = repository.get_all_master_prompts()
+        master_prompts = _repository_master_prompts(repository, repo_version)
         
         if master_prompts:
-            for prompt in master_prompts:
+            # Metadata for every prompt in one table; expanders only hold content
+            st.dataframe(_master_prompts_table(repository, repo_version), hide_index=True, use_container_width=True)
+            
+            # Only the current page of prompts gets an expander
+            total_pages = max(1, -(-len(master_prompts) // _MASTER_PROMPTS_PAGE_SIZE))
+            page = 1
+            if total_pages > 1:
+                page = st.number_input("Page", min_value=1, max_value=total_pages, value=1, step=1,
+                                       key="master_prompts_page")
+            page_start = (page - 1) * _MASTER_PROMPTS_PAGE_SIZE
+            for prompt in master_prompts[page_start:page_start + _MASTER_PROMPTS_PAGE_SIZE]:
                 with st.expander(f"{prompt['name']} ({prompt['category']})"):
-                    st.text_area("Content", value=prompt['content'], height=200, disabled=True)
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.text(f"Usage Count: {prompt.get('usage_count', 0)}")
-                    with col2:
-                        st.text(f"Created: {prompt['created'][:10]}")
-                    with col3:
-                        if prompt.get('last_used'):
-                            st.text(f"Last Used: {prompt['last_used'][:10]}")
+                    content = prompt['content']
+                    show_key = f"show_full_{prompt['id']}"
+                    if len(content) > _MASTER_PROMPT_PREVIEW_CHARS and not st.session_state.get(show_key):
+                        # Send only a preview until the full text is asked for
+                        st.text_area("Content", value=content[:_MASTER_PROMPT_PREVIEW_CHARS] + "…",
+                                     height=200, disabled=True, key=f"master_preview_{prompt['id']}")
+                        st.button("Show full", key=f"show_full_btn_{prompt['id']}",
+                                  on_click=_show_full_master_prompt, args=(show_key,))
+                    else:
+                        st.text_area("Content", value=content, height=200, disabled=True,
+                                     key=f"master_content_{prompt['id']}")
         else:
             st.info("No master prompts found. Run the setup script to initialize the repository.")
         
@@ -2637,20 +2570,21 @@ def prompt_repository_tab():
         st.subheader("Knowledge Base")
 
         # Display knowledge base by category
-        knowledge_base = repository.get_knowledge_base()
+        knowledge_preview = _repository_knowledge_preview(repository, repo_version)
 
-        for category, items in knowledge_base.items():
-            if items:
-                with st.expander(f"{category.replace('_', ' ').title()} ({len(items)} items)"):
-                    for item in items[:10]:  # Show first 10 items
+        for category, preview in knowledge_preview.items():
+            total = preview['total']
+            if total:
+                with st.expander(f"{category.replace('_', ' ').title()} ({total} items)"):
+                    for item in preview['preview']:  # Show first 10 items
                         st.text(f"- {item['item']}")
-                    if len(items) > 10:
-                        st.text(f"... and {len(items) - 10} more items")
+                    if total > len(preview['preview']):
+                        st.text(f"... and {total - len(preview['preview'])} more items")
 
         # Add new knowledge item
         st.subheader("Add Knowledge Item")
         with st.form("add_knowledge_item"):
-            category = st.selectbox("Category", list(knowledge_base.keys()))
+            category = st.selectbox("Category", _repository_knowledge_categories(repository, repo_version))
             item = st.text_input("Item")
             description = st.text_input("Description")
 
@@ -2668,21 +2602,27 @@ def prompt_repository_tab():
     with repo_tab3:
         st.subheader("Search Knowledge Base")
 
-        search_term = st.text_input("Search for knowledge items", placeholder="Enter search term...")
+        # The term only changes on submit, so typing never triggers a rerun
+        with st.form("kb_search"):
+            search_term = st.text_input("Search for knowledge items", placeholder="Enter search term...")
+            st.form_submit_button("Search")
 
-        if search_term:
-            results = repository.search_knowledge_base(search_term)
+        if search_term and len(search_term.strip()) < _KNOWLEDGE_SEARCH_MIN_CHARS:
+            # Very short terms match nearly everything; skip the search
+            st.info(f"Type at least {_KNOWLEDGE_SEARCH_MIN_CHARS} characters to search")
+        elif search_term:
+            results = _repository_knowledge_search(repository, search_term, repo_version)
 
             if results:
-                st.success(f"Found {sum(len(items) for items in results.values())} matching items")
+                # search_knowledge_base only returns categories with matches
+                st.success(f"Found {sum(map(len, results.values()))} matching items")
 
                 for category, items in results.items():
-                    if items:
-                        with st.expander(f"{category.replace('_', ' ').title()} ({len(items)} matches)"):
-                            for item in items:
-                                st.text(f"- {item['item']}")
-                                if item.get('description'):
-                                    st.caption(f"  {item['description']}")
+                    with st.expander(f"{category.replace('_', ' ').title()} ({len(items)} matches)"):
+                        for item in items:
+                            st.text(f"- {item['item']}")
+                            if item.get('description'):
+                                st.caption(f"  {item['description']}")
             else:
                 st.info("No matching items found")
 
@@ -2691,30 +2631,24 @@ def prompt_repository_tab():
         col1, col2 = st.columns(2)
 
         with col1:
-            if st.button("Export Repository"):
-                try:
-                    export_file = repository.export_repository()
-                    st.success(f"Repository exported to: {export_file}")
-                except Exception as e:
-                    st.error(f"Export failed: {str(e)}")
+            try:
+                # Download straight from memory; no export file is written on the server
+                st.download_button(
+                    label="Export Repository",
+                    data=_repository_export_bytes(repository, repo_version),
+                    file_name=f"prompt_repository_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                    mime="application/json"
+                )
+            except Exception as e:
+                st.error(f"Export failed: {str(e)}")
 
         with col2:
             uploaded_repo = st.file_uploader("Import Repository", type=['json'], help="Upload a repository JSON file")
             if uploaded_repo is not None:
                 if st.button("Import Repository"):
                     try:
-                        # Save uploaded file temporarily
-                        import tempfile
-                        with tempfile.NamedTemporaryFile(delete=False, suffix='.json') as tmp_file:
-                            tmp_file.write(uploaded_repo.getvalue())
-                            tmp_file_path = tmp_file.name
- 
-                        # Import repository
-                        success = repository.import_repository(tmp_file_path)
- 
-                        # Clean up temp file
-                        import os
-                        os.unlink(tmp_file_path)
+                        # Import straight from the uploaded buffer
+                        success = repository.import_repository_bytes(uploaded_repo.getvalue())
  
                         if success:
                             st.success("Repository imported successfully!")
@@ -2725,6 +2659,19 @@ def prompt_repository_tab():
                     except Exception as e:
                         st.error(f"Import failed: {str(e)}")
 
+# Pages routed by st.navigation, keyed by title
+_PAGES = {
+    'Dashboard': st.Page(dashboard_page, title='Dashboard', default=True),
+    'Generate Prompt': st.Page(generate_prompt_tab, title='Generate Prompt', url_path='generate-prompt'),
+    'Image Analysis': st.Page(image_analysis_tab, title='Image Analysis', url_path='image-analysis'),
+    'Prompt Repository': st.Page(prompt_repository_tab, title='Prompt Repository', url_path='prompt-repository'),
+    'Manage Prompts': st.Page(manage_prompts_tab, title='Manage Prompts', url_path='manage-prompts'),
+    'Generate Images': st.Page(generate_images_tab, title='Generate Images', url_path='generate-images'),
+    'Image Editing': st.Page(image_editing_tab, title='Image Editing', url_path='image-editing'),
+    'Settings': st.Page(settings_page, title='Settings', url_path='settings'),
+    'Image Vault': st.Page(image_vault_tab, title='Image Vault', url_path='image-vault'),
+}
+
 if __name__ == "__main__":
     main()
 